@@ -1,20 +1,39 @@
 """Toggle log-scale on and off. Provide button for it."""
-import warnings
-
 import matplotlib as mpl
-from matplotlib import pyplot as plt
 from matplotlib.widgets import CheckButtons  # Button
 
-from mpl_tools.misc import thousands
+from mpl_tools.misc import get_renderer, thousands
 from mpl_tools.place_ax import anchor_axes, get_legend_bbox
 
 
 def add_log_toggler(ax, pos="leg:S+W", ylim=None):
     """Add button that toggles log. scale."""
-    fig = ax.figure
+    return add_group_log_toggler([ax], pos, ylim)
+
+
+def add_group_log_toggler(axs, pos="leg:S+W", ylim=None):
+    """Add (one) button that toggles log. scale of (all of) `axs`.
 
-    if mpl.get_backend() == "Qt5Agg":
-        print("Warning: Qt5Agg is used, which is not very fast with this function")
+    If `axs` is a single axes, then it and its shared-y siblings are used.
+    The button is placed relative to the first axes,
+    and it switches the scales of all of them in one batch (see `toggle_scales`).
+
+    Example
+    -------
+    >>> from matplotlib import pyplot as plt
+    >>> fig, axs = plt.subplots(2, 2)
+    >>> for ax in axs.ravel():
+    ...     _ = ax.plot(10**np.arange(5))
+    >>> button = add_group_log_toggler(axs.ravel(), pos="NE")
+    >>> toggle_scale(axs[1, 1]); [ax.get_yscale() for ax in axs.ravel()]
+    ['log', 'log', 'log', 'log']
+    """
+    if isinstance(axs, mpl.axes.Axes):
+        siblings = axs.get_shared_y_axes().get_siblings(axs)
+        axs = [axs] + [a for a in siblings if a is not axs]
+    axs = list(axs)
+    ax = axs[0]
+    fig = ax.figure
 
     # button_ax: size and creation
     size = _xFontsize(mpl.rcParams['font.size'], fig, 10, 2.5)
@@ -29,42 +48,91 @@ def add_log_toggler(ax, pos="leg:S+W", ylim=None):
         # Position once only (will scale with figure):
         # align_ax_with(button_ax, get_legend_bbox(ax)(), "NW+")
     else:
-        anchor_axes(button_ax, lambda: ax.bbox, "NE")
+        anchor_axes(button_ax, lambda: ax.bbox, pos)
 
     # Create button/checkmarks
-    ax.log_toggler = CheckButtons(button_ax, ["Log scale"], [False])
-    # Adjust checkmark style
+    button = CheckButtons(button_ax, ["Log scale"], [False])
+    # Adjust checkmark style (mpl < 3.7)
     dh = .3
-    for box, cross in zip(ax.log_toggler.rectangles, ax.log_toggler.lines):
+    for box, cross in zip(getattr(button, "rectangles", []),
+                          getattr(button, "lines", [])):
         box.set_y(dh)
         box.set_height(1 - 2 * dh)
         cross[0].set_ydata([dh, 1 - dh])
         cross[1].set_ydata([dh, 1 - dh][::-1])
+    for a in axs:
+        a.log_toggler = button
 
     # Set callback
     def toggler(_):
-        return toggle_scale(ax, ylim, _toggle_button=False)
-    ax.log_toggler.on_clicked(toggler)
+        return toggle_scales(axs, ylim, _toggle_button=False)
+    button.on_clicked(toggler)
+    return button
 
 
 def toggle_scale(ax, ylim=None, formatter=thousands, _toggle_button=True):
     """Toggle log. scale.
 
+    The limits (incl. whether to autoscale) and tickers (locator and formatter
+    objects) of each scale are cached (on `ax`), until its data changes,
+    so that toggling back and forth is just a swap.
+    The tick locations and labels are not cached (they are computed on draw).
+
     _toggle_button is used internally. Do not set.
+
+    Example
+    -------
+    >>> from matplotlib import pyplot as plt
+    >>> fig, ax = plt.subplots()
+    >>> _ = ax.plot(10**np.arange(5))
+    >>> toggle_scale(ax); ax.get_yscale()
+    'log'
+    >>> toggle_scale(ax); toggle_scale(ax); ax.get_yscale()
+    'log'
     """
-    # Get status
-    log_is_on = getattr(ax, "_log_is_on", False)
+    toggle_scales([ax], ylim, formatter, _toggle_button)
+
+
+def toggle_scales(axs, ylim=None, formatter=thousands, _toggle_button=True):
+    """Toggle log. scale of all `axs` (to the opposite of that of the first).
+
+    All of the scales are changed before (a single) redraw.
+
+    _toggle_button is used internally. Do not set.
+    """
+    axs = list(axs)
 
     # Toggle button
     # NB: Setting the active status of the button
-    # will call this same function,
+    # will call this same function (for the group of the button),
     # but with _toggle_button=False.
-    if _toggle_button and hasattr(ax, "log_toggler"):
-        ax.log_toggler.set_active(0)
+    if _toggle_button and hasattr(axs[0], "log_toggler"):
+        axs[0].log_toggler.set_active(0)
 
     else:
-        # Toggle scale
-        ax._log_is_on = not log_is_on
+        log_on = not getattr(axs[0], "_log_is_on", False)
+        for ax in axs:
+            if getattr(ax, "_log_is_on", False) != log_on:
+                _toggle_scale(ax, ylim, formatter)
+        # The limits change anyway, so there is no point in blitting
+        for fig in {ax.figure for ax in axs}:
+            fig.canvas.draw_idle()
+
+
+def _toggle_scale(ax, ylim, formatter):
+    """Toggle scale of `ax` (without redrawing)."""
+    log_is_on = getattr(ax, "_log_is_on", False)
+    ax._log_is_on = not log_is_on
+    scale = "linear" if log_is_on else "log"
+    cache = _scale_cache(ax)
+    key = scale, None if ylim is None else tuple(ylim)
+    if key in cache:
+        # Swap in the cached state
+        lims, auto, tickers = cache[key]
+        ax.set_yscale(scale)
+        ax.set_ylim(lims, auto=auto)
+        _set_tickers(ax.yaxis, tickers)
+    else:
         if log_is_on:
             ax.set_yscale("linear")
             ax.set_ylim(bottom=0)
@@ -76,13 +144,38 @@ def toggle_scale(ax, ylim=None, formatter=thousands, _toggle_button=True):
                 ax.set_ylim(ylim)
             ax.set_yscale("log")
             ax.yaxis.set_major_formatter(formatter)
-        plt.draw()
+        cache[key] = ax.get_ylim(), ax.get_autoscaley_on(), _get_tickers(ax.yaxis)
+
+
+def _scale_cache(ax):
+    """Get the (per-scale) state cache of `ax`. Reset if its data has changed.
+
+    Changes are detected via the data limits (incl. the positive minimum)
+    and the identity of the (y) data of the lines.
+    """
+    lim = ax.dataLim
+    key = lim.bounds, tuple(lim.minpos), tuple(
+        id(lh.get_ydata(orig=True)) for lh in ax.get_lines())
+    if getattr(ax, "_scale_cache_key", None) != key:
+        ax._scale_cache_key = key
+        ax._scale_cache = {}
+    return ax._scale_cache
+
+
+def _get_tickers(axis):
+    return (axis.get_major_locator(), axis.get_major_formatter(),
+            axis.get_minor_locator(), axis.get_minor_formatter())
+
+
+def _set_tickers(axis, tickers):
+    major_loc, major_fmt, minor_loc, minor_fmt = tickers
+    axis.set_major_locator(major_loc)
+    axis.set_major_formatter(major_fmt)
+    axis.set_minor_locator(minor_loc)
+    axis.set_minor_formatter(minor_fmt)
 
 
 def _xFontsize(fontsize, fig, *args):
     """Multiply by fontsize, in pixels (rather than points)."""
-    with warnings.catch_warnings():
-        warnings.simplefilter("ignore", category=UserWarning)
-        plt.pause(.1)
-    fontsize = fig.canvas.renderer.points_to_pixels(fontsize)
+    fontsize = get_renderer(fig).points_to_pixels(fontsize)
     return tuple(a * fontsize for a in args)
@@ -1,12 +1,14 @@
 """Misc mpl tools."""
+import asyncio
 import inspect
-import warnings
 from math import sqrt
 from pathlib import Path
 
 import matplotlib as mpl
 from matplotlib import pyplot as plt
 
+from mpl_tools import is_using_interactive_backend
+
 thousands = mpl.ticker.StrMethodFormatter('{x:,.7g}')  # type: ignore
 
 
@@ -48,12 +50,55 @@ def fig_colorbar(fig, collections, *args, **kwargs):
     fig.subplots_adjust(right=0.8)
     cax = fig.add_axes([0.85, 0.15, 0.05, 0.7])
     cbar = fig.colorbar(collections, cax, *args, **kwargs)
-    with warnings.catch_warnings():
-        warnings.simplefilter("ignore", category=UserWarning)
-        plt.pause(.1)
+    flush(fig)
     return cbar
 
 
+def get_renderer(fig):
+    """Get the renderer of `fig`, without (blocking) `plt.pause` or GUI events.
+
+    Example
+    -------
+    >>> fig, ax = plt.subplots()
+    >>> get_renderer(fig).points_to_pixels(72) == fig.dpi
+    True
+    """
+    canvas = fig.canvas
+    if hasattr(canvas, "get_renderer"):  # Agg-based canvases
+        return canvas.get_renderer()
+    fig.draw_without_rendering()
+    return fig._get_renderer()
+
+
+def flush(fig, pause=0.0):
+    """Schedule a redraw of `fig` (`draw_idle`), and process pending GUI events.
+
+    Unlike `plt.pause`, this does not wait (nor spin the GUI event loop)
+    unless `pause > 0` and the backend is interactive.
+    It also does not (re-)show the figure window.
+    """
+    canvas = fig.canvas
+    canvas.draw_idle()
+    if pause > 0 and is_using_interactive_backend():
+        canvas.start_event_loop(pause)
+    else:
+        canvas.flush_events()
+
+
+async def aflush(fig, pause=0.0):
+    """Awaitable `flush`, yielding to the `asyncio` loop (e.g. of notebooks).
+
+    Example
+    -------
+    >>> fig, ax = plt.subplots()
+    >>> asyncio.run(aflush(fig))
+    """
+    canvas = fig.canvas
+    canvas.draw_idle()
+    canvas.flush_events()
+    await asyncio.sleep(pause)
+
+
 def nRowCol(nTotal, figsize=None, axsize=None):
     """Compute `(nrows, ncols)` such that `nTotal ≈ nrows*ncols`.
 
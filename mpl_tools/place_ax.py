@@ -1,6 +1,8 @@
 """Tools for placing axes in a figure."""
+import inspect
+
 import matplotlib as mpl
-from matplotlib import pyplot as plt
+import numpy as np
 from matplotlib.artist import allow_rasterization
 
 # from mpl_tools.misc import *
@@ -8,12 +10,36 @@ from matplotlib.artist import allow_rasterization
 __all__ = ["align_ax_with", "anchor_axes", "set_ax_size", "trans2fig"]
 
 
+def _axes_list(ax):
+    """Return `ax` as a list (of axes), and whether it was a single one."""
+    if isinstance(ax, mpl.axes.Axes):
+        return [ax], True
+    return list(np.ravel(ax)), False
+
+
+def _positions(axs):
+    """Get `(N, 4)` array of the positions (figure coords) of `axs`."""
+    return np.array([a.get_position().bounds for a in axs]).reshape(-1, 4)
+
+
+def _set_positions(axs, rects):
+    for a, rect in zip(axs, rects):
+        a.set_position(rect)
+
+
 def set_ax_size(ax, w, h):
-    """Width/Height in display (pixel) coords."""
-    fig = ax.figure
-    w, h = fig.transFigure.inverted().transform([w, h])
-    x, y, _, _ = ax.get_position().bounds
-    ax.set_position([x, y, w, h])
+    """Width/Height in display (pixel) coords.
+
+    `ax` may also be a list of axes (of the same figure),
+    in which case `w` and `h` may also be arrays.
+    """
+    axs, _ = _axes_list(ax)
+    fig = axs[0].figure
+    wh = np.broadcast_to(np.column_stack(np.broadcast_arrays(w, h)), (len(axs), 2))
+    wh = fig.transFigure.inverted().transform(wh)
+    pos = _positions(axs)
+    pos[:, 2:] = wh
+    _set_positions(axs, pos)
 
 
 def adjust_position(ax, adjust_extent=False, **kwargs):
@@ -22,6 +48,7 @@ def adjust_position(ax, adjust_extent=False, **kwargs):
     Parameters
     ----------
     ax: matplotlib.axes
+        Or list of axes, in which case the values (below) may also be arrays.
     adjust_extent: bool, optional
         If true: `x` and `y` produces `ax` resize, rather than shift.
         Defaults: False
@@ -29,9 +56,9 @@ def adjust_position(ax, adjust_extent=False, **kwargs):
         the keys must be `x0`, `y0`, `width`, `height`;
         the values are length changes.
     """
-    # Load get_position into d
-    pos = ax.get_position()
-    pos = {key: getattr(pos, key) for key in ['x0', 'y0', 'width', 'height']}
+    axs, _ = _axes_list(ax)
+    pos = _positions(axs)
+    cols = dict(x0=0, y0=1, width=2, height=3)
 
     abbrevs = dict(
         x = "x0",
@@ -45,16 +72,16 @@ def adjust_position(ax, adjust_extent=False, **kwargs):
         key = abbrevs.get(key, key)
 
         # Adjust
-        pos[key] += value
+        pos[:, cols[key]] += value
 
         if adjust_extent:
             if key == 'x0':
-                pos['width']  -= value
+                pos[:, 2] -= value
             if key == 'y0':
-                pos['height'] -= value
+                pos[:, 3] -= value
 
     # Set
-    ax.set_position(pos.values())
+    _set_positions(axs, pos)
 
 
 def align_ax_with(ax, bbox, loc, pad=4):
@@ -69,25 +96,37 @@ def align_ax_with(ax, bbox, loc, pad=4):
     meaning that the edge of ax is placed
     *outside* the opposite edge of (the container) bbox,
     with padding specified by pad.
+
+    `ax` may also be a list of axes (of the same figure), and `bbox` a list
+    of bboxes (or an `(N, 4)` array of their bounds, in display coords).
     """
-    # Get new bbox placed with mpl builtin tool
-    B = ax.bbox.anchored(loc.replace("+", ""), container=bbox)
+    axs, _ = _axes_list(ax)
+    if isinstance(bbox, mpl.transforms.BboxBase):
+        bbox = [bbox]
+    if not isinstance(bbox, np.ndarray):
+        bbox = [b.bounds for b in bbox]
+    x0, y0, w, h = np.broadcast_to(bbox, (len(axs), 4)).T
+    W, H = np.array([a.bbox.size for a in axs]).reshape(-1, 2).T
+
+    # Get new bbox placed as by the mpl builtin tool (`Bbox.anchored`)
+    cx, cy = mpl.transforms.Bbox.coefs[loc.replace("+", "")]
+    x = x0 + cx * (w - W)
+    y = y0 + cy * (h - H)
     # Adjust for + flags
-    x, y, w, h = B.bounds
     if "W+" in loc:
-        x += pad + bbox.width
+        x = x + pad + w
     if "E+" in loc:
-        x -= pad + bbox.width
+        x = x - pad - w
     if "S+" in loc:
-        y -= pad + h
+        y = y - pad - H
     if "N+" in loc:
-        y += pad + h
-    B = mpl.transforms.Bbox.from_bounds(x, y, w, h)
+        y = y + pad + H
     # Convert to figure coordinates
-    # B = B.inverse_transformed(ax.figure.transFigure) # deprecated
-    B = B.transformed(ax.figure.transFigure.inverted())
+    corners = np.column_stack([x, y, x + W, y + H]).reshape(-1, 2)
+    corners = axs[0].figure.transFigure.inverted().transform(corners).reshape(-1, 4)
+    corners[:, 2:] -= corners[:, :2]
     # Set
-    ax.set_position(B)
+    _set_positions(axs, corners)
 
 
 # TODO: make use of this in the above funcs
@@ -96,28 +135,30 @@ def trans2fig(axis, rect, from_data=True):
 
     Inspired by: https://stackoverflow.com/a/17478227/38281.
 
+    `rect` may also be an `(N, 4)` array, which is then transformed
+    (in one go) into an `(N, 4)` array.
+
     Example
     -------
     >>> rect = trans2fig(ax, [x,y,w,h]) # doctest: +SKIP
     ... ax2 = ax.figure.add_axes(rect)
     """
-    x, y, w, h = rect
-
-    FT = axis.figure.transFigure.inverted().transform
+    rect = np.asarray(rect, dtype=float)
+    rects = rect.reshape(-1, 4)
 
-    if from_data:
-        # Transform: data-->display-->figure
-        def T(xy):
-            return FT(axis.transData.transform(xy))
-    else:
-        # Transform: axes-->display-->figure
-        def T(xy):
-            return FT(axis.transAxes.transform(xy))
+    # Transform: data/axes-->display-->figure
+    T = axis.transData if from_data else axis.transAxes
+    T = T + axis.figure.transFigure.inverted()
 
-    x, y = T((x, y))
-    w, h = T([w, h]) - T([0, 0])  # affine transform wrt. 0
+    xy, wh = rects[:, :2], rects[:, 2:]
+    pts = T.transform(np.concatenate([xy, wh, [[0, 0]]]))
+    xy, wh, origin = pts[:len(rects)], pts[len(rects):-1], pts[-1]
+    wh = wh - origin  # affine transform wrt. 0
 
-    return x, y, w, h
+    out = np.column_stack([xy, wh])
+    if rect.ndim == 1:
+        return tuple(out[0])
+    return out
 
 
 def anchor_axes(ax, get_anchor, loc="NW+"):
@@ -125,30 +166,57 @@ def anchor_axes(ax, get_anchor, loc="NW+"):
 
     This is done by updating its placement whenever draw() is called,
     e.g. when the figure is resized.
+    The `renderer` of the draw is passed on to `get_anchor` (if it takes any args).
+    If `get_anchor` has a `key` attribute (e.g. `get_legend_bbox`),
+    the placement is only updated when it (or the figure size or dpi) changes,
+    unless it returns None.
 
     See also mpl_toolkits.axes_grid1.{Divider,Size}, demonstrated by:
     https://matplotlib.org/gallery/axes_grid1/demo_fixed_size_axes.html
     """
     # Save size
     size = ax.bbox.width, ax.bbox.height
+    takes_renderer = bool(inspect.signature(get_anchor).parameters)
+    get_key = getattr(get_anchor, "key", None)
+    placed = {}
 
     # Patch the Axes instance's draw() method.
     @allow_rasterization
     def draw(self, renderer):
-        set_ax_size(self, *size)
-        align_ax_with(self, get_anchor(), loc)
+        fig = self.figure
+        key = get_key and get_key()
+        if key is not None:
+            key = fig.bbox.bounds, fig.dpi, key
+        if key is None or key != placed.get("key"):
+            set_ax_size(self, *size)
+            anchor = get_anchor(renderer) if takes_renderer else get_anchor()
+            align_ax_with(self, anchor, loc)
+            placed["key"] = key
         _draw(renderer)
     _draw = ax.draw
     ax.draw = draw.__get__(ax)
 
 
 def get_legend_bbox(ax):
-    """Get legend's bbox in pixel ("display") coords."""
-    # Must pause/draw before bbox can be known
-    def inner():
-        plt.draw()
+    """Get (function that gets) legend's bbox in pixel ("display") coords.
+
+    It uses the renderer of the ongoing draw (rather than drawing).
+    Its `key` changes whenever the bbox might,
+    and is None for `loc="best"` (which moves with the data).
+    """
+    def inner(renderer=None):
+        return ax.get_legend().get_window_extent(renderer)
+
+    def key():
         leg = ax.get_legend()
-        bbox = leg.get_window_extent()
-        # bbox = leg.get_frame().get_bbox()
-        return bbox
+        if leg is None or leg._loc == 0:
+            return None
+        rows = [row.get_visible() for col in leg._legend_handle_box.get_children()
+                for row in col.get_children()]
+        texts = [t.get_text() for t in leg.texts]
+        anchor = leg.get_bbox_to_anchor().bounds
+        return (id(leg), leg.get_visible(), leg._loc, anchor,
+                tuple(rows), tuple(texts), ax.bbox.bounds)
+
+    inner.key = key
     return inner
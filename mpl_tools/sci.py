@@ -1,14 +1,106 @@
 """Science-related mpl tools."""
 
+import functools
+
 import matplotlib as mpl
 import matplotlib.ticker
 import numpy as np
 from matplotlib import pyplot as plt
+from matplotlib.collections import EllipseCollection
 from matplotlib.gridspec import GridSpec
 from matplotlib.patches import Ellipse
-from numpy.linalg import eigh
 
-from mpl_tools.place import freshfig
+from mpl_tools.misc import nRowCol
+from mpl_tools.place import freshfig, warn
+
+
+def _ellipse_geometry(sigma):
+    """Compute width, height and angle of 1-sigma ellipse(s) of 2x2 cov matrices.
+
+    Vectorized, closed-form alternative to `eigh`, for `sigma` of shape `(..., 2, 2)`.
+    The width is along the largest eigenvector, whose angle (in degrees) is in [0, 180).
+    """
+    sigma = np.asarray(sigma, dtype=float)
+    a, b, c = sigma[..., 0, 0], sigma[..., 0, 1], sigma[..., 1, 1]
+
+    # Eigenvalues of [[a, b], [b, c]]
+    mean = (a + c) / 2
+    radius = np.hypot((a - c) / 2, b)
+    w = 2 * np.sqrt((mean + radius).clip(0))
+    h = 2 * np.sqrt((mean - radius).clip(0))
+
+    # Angle of largest eigenvector
+    theta = np.degrees(np.arctan2(2 * b, a - c) / 2)
+    theta = theta % 180
+
+    return w, h, theta
+
+
+class CovEllipse(Ellipse):
+    """`Ellipse` of a cov matrix, which can be updated in place with `set_data`.
+
+    Reusing the artist (rather than removing and re-adding patches)
+    keeps memory and frame time steady, e.g. when animating a filter.
+    For blitting, create it with `animated=True`, and redraw with `ax.draw_artist`
+    (or return it from the `FuncAnimation(..., blit=True)` callback).
+    """
+
+    def __init__(self, mu, sigma, **kwargs):
+        w, h, theta = _ellipse_geometry(sigma)
+        super().__init__(mu, w, h, angle=theta, **kwargs)
+
+    def set_data(self, mu, sigma):
+        """Set mean and cov. Returns the artist (as a tuple), for blitting."""
+        w, h, theta = _ellipse_geometry(sigma)
+        self.set_center(mu)
+        self.set_width(w)
+        self.set_height(h)
+        self.set_angle(theta)
+        return (self,)
+
+
+class CovEllipses(EllipseCollection):
+    """Collection of cov ellipses, which can be updated in place with `set_data`.
+
+    See `CovEllipse`. The number of ellipses may change between updates.
+    """
+
+    def __init__(self, mu, sigma, **kwargs):
+        w, h, theta = _ellipse_geometry(sigma)
+        super().__init__(w, h, theta, units="xy", offsets=np.atleast_2d(mu), **kwargs)
+
+    def set_data(self, mu, sigma):
+        """Set means and covs. Returns the artist (as a tuple), for blitting."""
+        w, h, theta = _ellipse_geometry(sigma)
+        self.set_offsets(np.atleast_2d(mu))
+        self.set_widths(w)
+        self.set_heights(h)
+        self.set_angles(theta)
+        return (self,)
+
+    if not hasattr(EllipseCollection, "set_widths"):
+        # Backport (from mpl 3.9) of the geometry setters/getters
+
+        def set_widths(self, widths):
+            self._widths = 0.5 * np.asarray(widths).ravel()
+            self.stale = True
+
+        def set_heights(self, heights):
+            self._heights = 0.5 * np.asarray(heights).ravel()
+            self.stale = True
+
+        def set_angles(self, angles):
+            self._angles = np.deg2rad(angles).ravel()
+            self.stale = True
+
+        def get_widths(self):
+            return self._widths * 2
+
+        def get_heights(self):
+            return self._heights * 2
+
+        def get_angles(self):
+            return np.rad2deg(self._angles)
 
 
 def cov_ellipse(ax, mu, sigma, **kwargs):
@@ -16,6 +108,8 @@ def cov_ellipse(ax, mu, sigma, **kwargs):
 
     [Inspiration](https://stackoverflow.com/q/17952171)
 
+    Returns a `CovEllipse`, whose `set_data` can be used to update it.
+
     Example
     -------
     >>> fig, ax = plt.subplots()
@@ -23,17 +117,11 @@ def cov_ellipse(ax, mu, sigma, **kwargs):
     >>> _ = ax.set(xlim=(x-1, x+1), ylim=(y-1, y+1))
     >>> ellipse = cov_ellipse(ax, (x, y), C,
     ...                       fc='none', ec='r', lw=4, label='$1\\sigma$')
+    >>> for k in range(3):
+    ...     _ = ellipse.set_data((x, y + k/10), np.array(C) / (k+1))
     """
-    # Cov --> Width, Height, Theta
-    vals, vecs = eigh(sigma)
-    x, y = vecs[:, -1]  # x-y components of largest (last) eigenvector
-    theta = np.degrees(np.arctan2(y, x))
-    theta = theta % 180
-
-    h, w = 2 * np.sqrt(vals.clip(0))
-
     # Get artist
-    e = Ellipse(mu, w, h, angle=theta, **kwargs)
+    e = CovEllipse(mu, sigma, **kwargs)
 
     ax.add_patch(e)
     e.set_clip_box(ax.bbox)  # why is this necessary?
@@ -42,6 +130,164 @@ def cov_ellipse(ax, mu, sigma, **kwargs):
     return e
 
 
+def cov_ellipses(ax, mu, sigma, **kwargs):
+    """Draw many `cov_ellipse`s at once, as a single `EllipseCollection`.
+
+    Takes `mu` of shape `(N, 2)` and `sigma` of shape `(N, 2, 2)`.
+    The geometry is computed in one vectorized pass (no `eigh`),
+    and styling kwargs (e.g. `facecolors`, `edgecolors`, `linewidths`)
+    may be given per ellipse, as for any `Collection`.
+
+    Returns a `CovEllipses`, whose `set_data` can be used to update it.
+
+    Example
+    -------
+    >>> fig, ax = plt.subplots()
+    >>> mu = np.random.randn(100, 2)
+    >>> L = np.random.randn(100, 2, 2) / 10
+    >>> C = L @ L.swapaxes(-1, -2)
+    >>> ellipses = cov_ellipses(ax, mu, C, facecolors='none',
+    ...                         edgecolors=plt.cm.viridis(np.linspace(0, 1, 100)))
+    >>> len(ellipses.get_widths())
+    100
+    >>> _ = ellipses.set_data(mu + 1, C / 2)
+    """
+    # Get artist
+    kwargs.setdefault("offset_transform", ax.transData)
+    ec = CovEllipses(mu, sigma, **kwargs)
+
+    ax.add_collection(ec)
+
+    # Return artist
+    return ec
+
+
+class CovAccumulator:
+    """Accumulate mean and covariance of (ensemble) samples, chunk by chunk.
+
+    Uses the Welford/Chan et al. updates, so the memory is constant
+    (irrespective of the number of samples), and accumulators (e.g. from
+    different chunks or worker processes) can be combined with `merge`.
+    The samples may have batch dimensions, e.g. for many 2D projections at once.
+
+    Example
+    -------
+    >>> acc = CovAccumulator()
+    >>> for _ in range(10):
+    ...     E = np.random.randn(100, 30, 2)  # 100 members, 30 projections
+    ...     acc = acc.update(E)
+    >>> acc.n, acc.cov.shape
+    (1000, (30, 2, 2))
+    >>> fig, ax = plt.subplots()
+    >>> ellipses = acc.ellipses(ax, facecolors="none", edgecolors="k")
+    """
+
+    def __init__(self):
+        self.n = 0
+        self.mean = 0
+        self.M2 = 0
+
+    def update(self, X, axis=0):
+        """Add the samples `X` (along `axis`). Returns self."""
+        X = np.moveaxis(np.asarray(X, dtype=float), axis, 0)
+        other = CovAccumulator()
+        other.n = len(X)
+        other.mean = X.mean(0)
+        X = X - other.mean
+        other.M2 = np.einsum("n...i,n...j->...ij", X, X)
+        return self.merge(other)
+
+    def merge(self, other):
+        """Combine with (the statistics of) `other` accumulator. Returns self."""
+        n = self.n + other.n
+        if other.n:
+            delta = other.mean - self.mean
+            self.M2 = (
+                self.M2
+                + other.M2
+                + delta[..., :, None] * delta[..., None, :] * (self.n * other.n / n)
+            )
+            self.mean = self.mean + delta * (other.n / n)
+            self.n = n
+        return self
+
+    @property
+    def cov(self):
+        """Sample covariance (i.e. normalized by `n-1`)."""
+        return self.M2 / (self.n - 1)
+
+    def ellipses(self, ax, **kwargs):
+        """Draw `cov_ellipses` of the (2D) mean and cov of each batch element."""
+        mu = np.reshape(self.mean, (-1, 2))
+        sigma = np.reshape(self.cov, (-1, 2, 2))
+        return cov_ellipses(ax, mu, sigma, **kwargs)
+
+
+def cov_corner(mu, sigma, labels=None, corner=True, fig=None, **kwargs):
+    """Draw the 2D marginal `cov_ellipses` of (a batch of) d-dimensional Gaussians.
+
+    Takes `mu` of shape `([N,] d)` and `sigma` of shape `([N,] d, d)`,
+    e.g. a batch over time or ensemble members.
+    The 2x2 blocks of all pairs `(i, j)` are extracted in one (vectorized) step,
+    and each panel draws the `N` ellipses as a single collection (with `**kwargs`).
+
+    If `corner`, the panels are laid out as the lower triangle of a GridSpec
+    (with shared axes), else on a compact grid (see `mpl_tools.misc.nRowCol`).
+
+    Returns `axs` and `ellipses`, both dicts keyed by the pair `(i, j)`.
+
+    Example
+    -------
+    >>> fig = plt.figure()
+    >>> L = np.random.randn(5, 4, 4)
+    >>> C = L @ L.swapaxes(-1, -2)
+    >>> axs, ellipses = cov_corner(np.random.randn(5, 4), C, labels="abcd",
+    ...                            fig=fig, facecolors="none", edgecolors="C0")
+    >>> sorted(axs)
+    [(0, 1), (0, 2), (0, 3), (1, 2), (1, 3), (2, 3)]
+    """
+    mu = np.atleast_2d(mu)
+    sigma = np.asarray(sigma).reshape(-1, *np.shape(sigma)[-2:])
+    d = mu.shape[-1]
+    fig = fig or plt.gcf()
+
+    # All pairs and their blocks
+    ii, jj = np.triu_indices(d, 1)
+    idx = np.stack([ii, jj], -1)  # (P, 2)
+    means = mu[:, idx]  # (N, P, 2)
+    blocks = sigma[:, idx[:, :, None], idx[:, None, :]]  # (N, P, 2, 2)
+
+    # Axes limits (3 sigma)
+    std = np.sqrt(np.diagonal(sigma, axis1=-2, axis2=-1).clip(0))
+    lims = np.stack([(mu - 3 * std).min(0), (mu + 3 * std).max(0)], -1)
+
+    # Layout
+    if corner:
+        gs = GridSpec(d - 1, d - 1)
+    else:
+        gs = GridSpec(**nRowCol(len(ii), fig.get_size_inches()))
+    axs, ellipses = {}, {}
+    for p, (i, j) in enumerate(zip(ii.tolist(), jj.tolist())):
+        if corner:
+            # Share x along columns (i) and y along rows (j)
+            ax = fig.add_subplot(
+                gs[j - 1, i],
+                sharex=axs.get((i, i + 1)),
+                sharey=axs.get((0, j)),
+            )
+        else:
+            ax = fig.add_subplot(gs[p])
+        ax.set(xlim=lims[i], ylim=lims[j])
+        if labels is not None:
+            ax.set(xlabel=labels[i], ylabel=labels[j])
+        if corner:
+            ax.label_outer()
+        axs[i, j] = ax
+        ellipses[i, j] = cov_ellipses(ax, means[:, p], blocks[:, p], **kwargs)
+
+    return axs, ellipses
+
+
 def axes_with_marginals(n_joint, n_marg, **kwargs):
     """Create a joint axis along with two marginal axes.
 
@@ -75,14 +321,159 @@ def axes_with_marginals(n_joint, n_marg, **kwargs):
     return ax0, a_x, a_y
 
 
-def discretize_cmap(cmap, N, val0=0, val1=1, name=None):
-    """Discretize `cmap` into `N` segments.
+def _xy_chunks(x, y=None, size=2**22):
+    """Yield chunks `(x, y)` of (the slices of) arrays `x` and `y`.
 
-    The segments delimiters are `[k/N for k in range(N)]`.
-    Alternatively, for **integer** `k in range(N)`: `cmap(k) == cmap(k/N)`.
-    Useful for applying colormaps to a set of line plots, especially since it also
-    returns a function to create an accompanying colorbar, given `N` tick labels.
+    If `y` is None, then `x` should be an iterable of such chunks,
+    e.g. a generator that loads them from disk.
+    """
+    if y is None:
+        for xy in x:
+            yield tuple(np.ravel(a) for a in xy)
+    else:
+        for i in range(0, len(x), size):
+            yield np.ravel(x[i : i + size]), np.ravel(y[i : i + size])
+
+
+def _hist2d(chunks, bins, extent):
+    """Histogram of the `(x, y)` chunks, with `bins` (2 ints) spanning `extent`.
+
+    Equivalent to `np.histogram2d` (with bins of equal width),
+    but the bin index is computed directly (rather than by searching).
+    """
+    (x0, x1), (y0, y1) = extent
+    nx, ny = bins
+    H = np.zeros(nx * ny, dtype=np.int64)
+    for x, y in chunks:
+        i = np.floor((x - x0) / (x1 - x0) * nx)
+        j = np.floor((y - y0) / (y1 - y0) * ny)
+        # Include right edges (as numpy)
+        i[x == x1] = nx - 1
+        j[y == y1] = ny - 1
+        inside = (0 <= i) & (i < nx) & (0 <= j) & (j < ny)
+        ij = i[inside].astype(np.int64) * ny + j[inside].astype(np.int64)
+        H += np.bincount(ij, minlength=len(H))
+    return H.reshape(nx, ny)
+
+
+class _LinkedMarginals:
+    """Make the marginal histograms only count the points in view of `ax0`.
+
+    Uses prefix sums of the 2D histogram `H`,
+    so that each update costs `O(bins)`, irrespective of the number of points.
+    """
+
+    def __init__(self, ax0, a_x, a_y, H, xedges, yedges):
+        self.axs = ax0, a_x, a_y
+        self.centers = [(e[1:] + e[:-1]) / 2 for e in (xedges, yedges)]
+        nx, ny = H.shape
+        self.Cx = np.zeros((nx, ny + 1), H.dtype)
+        self.Cy = np.zeros((nx + 1, ny), H.dtype)
+        np.cumsum(H, 1, out=self.Cx[:, 1:])
+        np.cumsum(H, 0, out=self.Cy[1:])
+        self.steps = a_x.patches[-1], a_y.patches[-1]
+        ax0.callbacks.connect("xlim_changed", self.update)
+        ax0.callbacks.connect("ylim_changed", self.update)
+
+    def update(self, _=None):
+        ax0, a_x, a_y = self.axs
+        # Bins (whose centers are) in view
+        i0, i1 = np.searchsorted(self.centers[0], sorted(ax0.get_xlim()))
+        j0, j1 = np.searchsorted(self.centers[1], sorted(ax0.get_ylim()))
+        hx = self.Cx[:, j1] - self.Cx[:, j0]
+        hy = self.Cy[i1] - self.Cy[i0]
+        self.steps[0].set_data(hx)
+        self.steps[1].set_data(hy)
+        a_x.set_ylim(0, 1.05 * hx[i0:i1].max(initial=1))
+        a_y.set_xlim(0, 1.05 * hy[j0:j1].max(initial=1))
+
+
+def hist2d_with_marginals(
+    x,
+    y=None,
+    bins=100,
+    range=None,
+    n_joint=4,
+    n_marg=1,
+    chunksize=2**22,
+    linked=False,
+    **kwargs,
+):
+    """Do `axes_with_marginals`, and fill them with 2D and 1D histograms.
+
+    Rather than a scatter plot (unusable for millions of points), the joint axes
+    shows the 2D histogram as an image (using `**kwargs`, e.g. `cmap` and `norm`).
+    The marginal histograms are its sums, i.e. they use the same bins.
+
+    The data is binned in a single pass, one chunk (of `chunksize`) at a time,
+    so `x` and `y` may be `np.memmap`s. Alternatively, `x` may be an iterable
+    of `(x, y)` chunks (with `y=None`), in which case `range` is required.
+    As for `np.histogram2d`, `range` is `[(xmin, xmax), (ymin, ymax)]`.
+
+    If `linked`, the marginals only count the points that are in view of `ax0`,
+    i.e. they get updated upon zooming and panning, at a cost of `O(bins)`.
+
+    Returns `(ax0, a_x, a_y), (H, xedges, yedges)`.
+
+    Example
+    -------
+    >>> x, y = np.random.randn(2, 10**6)
+    >>> axs, (H, xedges, yedges) = hist2d_with_marginals(x, y, cmap="Blues")
+    >>> int(H.sum())
+    1000000
+
+    >>> chunks = (np.random.randn(2, 1000) for _ in range(10))
+    >>> axs, (H, *_) = hist2d_with_marginals(chunks, range=[(-3, 3), (-3, 3)])
+
+    >>> (ax0, a_x, a_y), _ = hist2d_with_marginals(x, y, linked=True)
+    >>> _ = ax0.set_ylim(0, 1)
     """
+    bins = tuple(np.broadcast_to(bins, 2))
+
+    # Get range (by a separate pass)
+    if range is None:
+        if y is None:
+            raise ValueError("`range` is required when `x` is an iterable of chunks.")
+        range = [[np.inf, -np.inf], [np.inf, -np.inf]]
+        for xy in _xy_chunks(x, y, chunksize):
+            for lims, a in zip(range, xy):
+                lims[:] = min(lims[0], np.nanmin(a)), max(lims[1], np.nanmax(a))
+    range = [(a, b) if a < b else (a - 0.5, b + 0.5) for a, b in range]
+
+    H = _hist2d(_xy_chunks(x, y, chunksize), bins, range)
+    xedges, yedges = (np.linspace(*lims, n + 1) for lims, n in zip(range, bins))
+
+    # Plot
+    ax0, a_x, a_y = axes_with_marginals(n_joint, n_marg)
+    kwargs.setdefault("aspect", "auto")
+    kwargs.setdefault("interpolation", "nearest")
+    ax0.imshow(H.T, origin="lower", extent=[*range[0], *range[1]], **kwargs)
+    a_x.stairs(H.sum(1), xedges, fill=True)
+    a_y.stairs(H.sum(0), yedges, orientation="horizontal", fill=True)
+    if linked:
+        # Keep (strong) reference, as callbacks only hold weak ones
+        ax0.marginals = _LinkedMarginals(ax0, a_x, a_y, H, xedges, yedges)
+
+    return (ax0, a_x, a_y), (H, xedges, yedges)
+
+
+class _Ident:
+    """Wrap object to make it hashable by identity (and keep it alive)."""
+
+    def __init__(self, obj):
+        self.obj = obj
+
+    def __hash__(self):
+        return id(self.obj)
+
+    def __eq__(self, other):
+        return isinstance(other, _Ident) and self.obj is other.obj
+
+
+@functools.lru_cache(maxsize=128)
+def _discretize_cmap(cmap, N, val0, val1, name):
+    """Cached part of `discretize_cmap`. The `cmap` is a name or an `_Ident`."""
+    cmap = plt.get_cmap(cmap) if isinstance(cmap, str) else cmap.obj
     # LinearSegmentedColormap
     from_list = mpl.colors.LinearSegmentedColormap.from_list
     colors = cmap(np.linspace(val0, val1, N))
@@ -93,116 +484,589 @@ def discretize_cmap(cmap, N, val0=0, val1=1, name=None):
     # by or `matshow` or `coutourf`, getting the bounds from the data.
     cNorm = mpl.colors.Normalize(-0.5, -0.5 + N)
     sm = mpl.cm.ScalarMappable(cNorm, cmap)
+    return cmap, sm
+
+
+def discretize_cmap(cmap, N, val0=0, val1=1, name=None):
+    """Discretize `cmap` into `N` segments.
+
+    The segments delimiters are `[k/N for k in range(N)]`.
+    Alternatively, for **integer** `k in range(N)`: `cmap(k) == cmap(k/N)`.
+    Useful for applying colormaps to a set of line plots, especially since it also
+    returns a function to create an accompanying colorbar, given `N` tick labels.
+
+    The results are cached (LRU) on the parameters and on the name of `cmap`
+    (if it is a registered colormap, or a string), else its identity.
+    Therefore, do not modify the returned colormap or mappable (copy them instead).
+    Use `discretize_cmap.cache_info()` for hit/miss statistics,
+    and `discretize_cmap.cache_clear()` to empty the cache.
+
+    Example
+    -------
+    >>> discretize_cmap.cache_clear()
+    >>> for ax in range(3):
+    ...     cmap, create_cbar, sm = discretize_cmap(plt.get_cmap("viridis"), 5)
+    >>> discretize_cmap.cache_info().hits
+    2
+    """
+    if isinstance(cmap, str):
+        key = cmap
+    elif cmap.name in mpl.colormaps and cmap == mpl.colormaps[cmap.name]:
+        key = cmap.name
+    else:
+        key = _Ident(cmap)
+    cmap, sm = _discretize_cmap(key, N, val0, val1, name)
 
     # Set-up convenvience function to label cbar ticks
     def create_cbar(ax, ticklabels=None, **kwargs):
         fig = ax[0].figure if isinstance(ax, (list, tuple, np.ndarray)) else ax.figure
-        cb = fig.colorbar(sm, ax=ax, **kwargs)
+        # Independent mappable, since a colorbar attaches itself to it
+        cNorm = mpl.colors.Normalize(-0.5, -0.5 + N)
+        cb = fig.colorbar(mpl.cm.ScalarMappable(cNorm, cmap), ax=ax, **kwargs)
         if ticklabels:
             cb.set_ticks(np.arange(len(ticklabels)))
             cb.set_ticklabels(ticklabels)
         return cb
 
-    return sm.cmap, create_cbar, sm
+    return cmap, create_cbar, sm
 
 
-def matshow_discrete(X, fig_ax=None, cmap=None, mode="set", ndigits=8):
-    """Do matshow, add **discrete colorbar**.
+discretize_cmap.cache_info = _discretize_cmap.cache_info
+discretize_cmap.cache_clear = _discretize_cmap.cache_clear
 
-    Inspired by https://stackoverflow.com/a/60870122
 
-    Example:
-    >>> from scipy import sparse
-    >>> D = sparse.diags([1, -2, 1], [-1, 0, 1], shape=(9, 9))
-    >>> image, colorbar = matshow_discrete(D.toarray())
+def _row_chunks(X, size=2**22):
+    """Yield blocks of rows of `X`, of about `size` elements each.
+
+    Only one block is loaded at a time, so this also works for (huge) `np.memmap`s.
+    """
+    rows = max(1, size // max(1, X.shape[-1]))
+    for i in range(0, len(X), rows):
+        yield np.asarray(X[i : i + rows])
+
+
+def _pool(X, k, how="mode"):
+    """Pool `X` over blocks of `k x k` elements. The edges get padded by repetition.
+
+    - `how="mean"`  : Average.
+    - `how="maxabs"`: Value with largest magnitude (retaining its sign).
+    - `how="mode"`  : Most frequent value (the smallest one, in case of ties).
     """
-    if isinstance(fig_ax, str):
-        fig, ax = freshfig(fig_ax)
-    elif fig_ax is None:
-        fig, ax = freshfig("matshow_discrete")
+    m, n = X.shape
+    X = np.pad(X, ((0, -m % k), (0, -n % k)), mode="edge")
+    m, n = X.shape[0] // k, X.shape[1] // k
+    B = X.reshape(m, k, n, k).swapaxes(1, 2).reshape(m, n, k * k)
+
+    if how == "mean":
+        return B.mean(-1)
+    elif how == "maxabs":
+        i = abs(B).argmax(-1)
+    elif how == "mode":
+        B = np.sort(B, -1)
+        # Length of the run (of equal values) up to (and including) each element
+        ii = np.arange(k * k)
+        new = np.ones(B.shape, bool)
+        new[..., 1:] = B[..., 1:] != B[..., :-1]
+        runs = ii - np.maximum.accumulate(np.where(new, ii, 0), axis=-1)
+        i = runs.argmax(-1)
     else:
-        fig, ax = fig_ax
-
-    X = np.asarray(X)
-    m, M = X.min(), X.max()
-
-    # Default cmap
-    if cmap is None:
-        if M == 0:
-            cmap = "cool"
-        elif m == 0:
-            cmap = "autumn"
-        elif m < 0 and M > 0:
-            cmap = "coolwarm"
+        raise ValueError(f"Invalid pooling: {how!r}")
+    return np.take_along_axis(B, i[..., None], -1)[..., 0]
+
+
+class _Pyramid:
+    """Multi-resolution levels of matrix `X`, pooled by powers of 2.
+
+    Levels of no more than `cache_size` elements are computed lazily (and then cached),
+    each from the finest level already available, and one block of rows at a time.
+    Of the finer levels, only the tiles in view are pooled (from `X`),
+    so that a (huge) `np.memmap` is never loaded whole.
+    """
+
+    def __init__(self, X, pool="mode", cache_size=2**22):
+        self.shape = X.shape
+        self.pool = pool
+        self.cache_size = cache_size
+        self.levels = {1: X}
+
+    def blocks(self):
+        """Yield blocks of the values of `X`."""
+        yield from _row_chunks(self.levels[1])
+
+    def _pooled(self, f, r0, r1, c0, c1):
+        """Pool `[r0:r1, c0:c1]` of level `f` from the finest (cached) level."""
+        g = max(g for g in self.levels if g < f)
+        k = f // g
+        X = self.levels[g][r0 * k : r1 * k, c0 * k : c1 * k]
+        rows = k * max(1, 2**22 // (k * X.shape[1]))
+        return np.concatenate(
+            [_pool(B, k, self.pool) for B in _row_chunks(X, rows * X.shape[1])]
+        )
+
+    def level(self, f):
+        if f not in self.levels:
+            m, n = self.shape
+            self.levels[f] = self._pooled(f, 0, -(-m // f), 0, -(-n // f))
+        return self.levels[f]
+
+    def tile(self, r0, r1, c0, c1, h, w):
+        """Get `X[r0:r1, c0:c1]`, pooled to no less than `h x w` elements.
+
+        Returns the tile along with its `extent` (as used by `imshow`).
+        """
+        f = max(1, min((r1 - r0) // h, (c1 - c0) // w))
+        f = 2 ** int(np.log2(f))
+        r0, c0 = r0 // f, c0 // f
+        r1, c1 = -(-r1 // f), -(-c1 // f)
+        m, n = self.shape
+        if f in self.levels or -(-m // f) * -(-n // f) <= self.cache_size:
+            Z = np.asarray(self.level(f)[r0:r1, c0:c1])
         else:
-            cmap = "jet"
-
-    if mode == "set":
-        # Get unique, sorted list of values
-        S = np.round(X, ndigits)
-        S = set(S.flat)  # unique
-        S = np.array(sorted(S))
-        # Get boundaries below and above each value of S
-        # (the exact amount of these margins don't matter).
-        bins = (S[1:] + S[:-1]) / 2
-        bins = np.concatenate(([m - 1], bins, [M + 1]))
-        # Center ticks (vs bins)
-        ticks = bins[:-1] + np.diff(bins) / 2
-        # Custom tick labels
-        formatter = matplotlib.ticker.FuncFormatter(
+            Z = self._pooled(f, r0, r1, c0, c1)
+        extent = np.array([c0, c1, r1, r0]) * f - 0.5
+        return Z, extent
+
+
+def _issparse(X):
+    """Check if `X` is a `scipy.sparse` matrix (without requiring scipy)."""
+    try:
+        from scipy import sparse
+    except ImportError:
+        return False
+    return sparse.issparse(X)
+
+
+def _rasterize(rows, cols, vals, r0, r1, c0, c1, h, w):
+    """Rasterize nonzeros (`rows, cols, vals`) of `[r0:r1, c0:c1]` to `<= h x w` pixels.
+
+    Returns the image along with its `extent` (as used by `imshow`).
+    """
+    # Pixel index
+    h, w = min(h, r1 - r0), min(w, c1 - c0)
+    extent = np.array([c0, c1, r1, r0]) - 0.5
+    if len(vals) == 0:
+        return np.zeros((h, w), vals.dtype), extent
+    pix = (rows - r0) * h // (r1 - r0) * w + (cols - c0) * w // (c1 - c0)
+
+    # Where several nonzeros share a pixel, show the one of largest magnitude
+    order = np.lexsort((abs(vals), pix))
+    pix, vals = pix[order], vals[order]
+    last = np.append(pix[1:] != pix[:-1], True)
+    Z = np.zeros(h * w, vals.dtype)
+    Z[pix[last]] = vals[last]
+
+    return Z.reshape(h, w), extent
+
+
+class _SparseRaster:
+    """Rasterize (`scipy.sparse`) matrix `X` from its nonzeros only.
+
+    The structural zeros are shown as 0 (i.e. one implicit level),
+    so the cost scales with the number of nonzeros (rather than the size of `X`).
+    """
+
+    def __init__(self, X):
+        X = X.tocoo()
+        X.sum_duplicates()
+        order = np.argsort(X.row, kind="stable")
+        self.rows = X.row[order].astype(np.int64)
+        self.cols = X.col[order].astype(np.int64)
+        self.vals = X.data[order]
+        self.shape = X.shape
+
+    def blocks(self):
+        """Yield the nonzeros, and a 0 if there are any structural zeros."""
+        yield self.vals
+        if len(self.vals) < self.shape[0] * self.shape[1]:
+            yield np.zeros(1, self.vals.dtype)
+
+    def tile(self, r0, r1, c0, c1, h, w):
+        """Rasterize `X[r0:r1, c0:c1]` to no more than `h x w` pixels.
+
+        Returns the image along with its `extent` (as used by `imshow`).
+        """
+        # Select nonzeros in view
+        i0, i1 = np.searchsorted(self.rows, [r0, r1])
+        rows, cols, vals = self.rows[i0:i1], self.cols[i0:i1], self.vals[i0:i1]
+        inside = (c0 <= cols) & (cols < c1)
+        rows, cols, vals = rows[inside], cols[inside], vals[inside]
+        return _rasterize(rows, cols, vals, r0, r1, c0, c1, h, w)
+
+
+class _BandedRaster:
+    """Rasterize symmetric matrix from its `bands` (as in `solveh_banded`).
+
+    Like `_SparseRaster`, but without ever forming the (sparse or dense) matrix,
+    i.e. the cost is that of the bands, `O(m * len(bands))`.
+    """
+
+    def __init__(self, bands, lower=True):
+        self.lower = lower  # form of the input (for frames of the same kind)
+        bands = np.atleast_2d(bands)
+        m = bands.shape[-1]
+        if not lower:
+            # Convert to lower form: `upper[u - k, j + k] == lower[k, j]`
+            u = len(bands) - 1
+            L = np.zeros_like(bands)
+            for k in range(u + 1):
+                L[k, : m - k] = bands[u - k, k:]
+            bands = L
+        self.bands = bands
+        self.shape = (m, m)
+
+    def blocks(self):
+        """Yield the bands, and a 0 if there are any entries outside of them."""
+        m = self.shape[0]
+        for k, band in enumerate(self.bands):
+            yield band[: m - k]
+        if len(self.bands) < m:
+            yield np.zeros(1, self.bands.dtype)
+
+    def tile(self, r0, r1, c0, c1, h, w):
+        """Rasterize `A[r0:r1, c0:c1]` to no more than `h x w` pixels.
+
+        Returns the image along with its `extent` (as used by `imshow`).
+        """
+        m = self.shape[0]
+        rows, cols, vals = [], [], []
+        for k, band in enumerate(self.bands):
+            for d in (k, -k) if k else (0,):
+                # Elements (i, i+d) in view, i.e. the band's entries on diagonal d
+                i = np.arange(max(r0, c0 - d, 0, -d), min(r1, c1 - d, m, m - d))
+                rows.append(i)
+                cols.append(i + d)
+                vals.append(band[np.minimum(i, i + d)])
+        rows, cols, vals = map(np.concatenate, (rows, cols, vals))
+        return _rasterize(rows, cols, vals, r0, r1, c0, c1, h, w)
+
+
+class _ViewLinkedImage:
+    """Keep the data of `im` set to the `source.tile` that matches the view of `ax`.
+
+    I.e. only the part of the matrix that is in view gets rendered,
+    and at (no more than) the resolution of the screen.
+    """
+
+    def __init__(self, ax, im, source, transform=None):
+        self.ax = ax
+        self.im = im
+        self.source = source
+        self.transform = transform
+        # Fix the limits at full view (`set_extent` would otherwise autoscale)
+        m, n = source.shape
+        ax.set(xlim=(-0.5, n - 0.5), ylim=(m - 0.5, -0.5))
+        ax.set_autoscale_on(False)
+        ax.callbacks.connect("xlim_changed", self.update)
+        ax.callbacks.connect("ylim_changed", self.update)
+        ax.figure.canvas.mpl_connect("resize_event", self.update)
+        self.update()
+
+    def update(self, _=None):
+        m, n = self.source.shape
+        x0, x1 = sorted(self.ax.get_xlim())
+        y0, y1 = sorted(self.ax.get_ylim())
+        c0, c1 = np.clip([int(np.floor(x0 + 0.5)), int(np.ceil(x1 + 0.5))], 0, n)
+        r0, r1 = np.clip([int(np.floor(y0 + 0.5)), int(np.ceil(y1 + 0.5))], 0, m)
+        if r0 >= r1 or c0 >= c1:
+            return
+        h, w = (max(1, int(x)) for x in (self.ax.bbox.height, self.ax.bbox.width))
+        Z, extent = self.source.tile(r0, r1, c0, c1, h, w)
+        if self.transform is not None:
+            Z = self.transform(Z)
+        self.im.set_data(Z)
+        self.im.set_extent(extent)
+
+
+def _matshow(ax, source, lod=False, transform=None, **kwargs):
+    """Do `ax.matshow`, but with level-of-detail rendering (of `source`) if `lod`."""
+    if not lod:
+        return ax.matshow(source.level(1), **kwargs)
+    im = ax.matshow(np.zeros((1, 1)), **kwargs)
+    # Keep (strong) reference, as callbacks only hold weak ones
+    im.lod = _ViewLinkedImage(ax, im, source, transform)
+    return im
+
+
+def _levels(blocks, ndigits, max_levels=np.inf, return_index=False):
+    """Get the (sorted) unique values of all `blocks`, rounded to `ndigits`.
+
+    Returns `None` (as soon as it is known) if there are more than `max_levels`.
+    With `return_index`, also return the level index of each element (of the blocks,
+    stacked), as found by `return_inverse` (and a lookup for each block's levels).
+    """
+    S, parts = np.array([]), []
+    for B in blocks:
+        B = np.round(B, ndigits)
+        if return_index:
+            s, inv = np.unique(B, return_inverse=True)
+            parts.append((s, inv.reshape(B.shape)))
+        else:
+            s = np.unique(B)
+        S = np.union1d(S, s)
+        if len(S) > max_levels:
+            return None
+    if not return_index:
+        return S
+    dtype = np.min_scalar_type(len(S))
+    index = [np.searchsorted(S, s).astype(dtype)[inv] for s, inv in parts]
+    return S, np.concatenate(index)
+
+
+def _minmax(blocks):
+    """Get the min and max over all (non-empty) `blocks`."""
+    m, M = np.inf, -np.inf
+    for B in blocks:
+        if np.size(B):
+            m, M = min(m, B.min()), max(M, B.max())
+    return m, M
+
+
+def _level_index(S, Z):
+    """Map the values of `Z` to the index of the nearest level in `S`."""
+    bins = (S[1:] + S[:-1]) / 2
+    return np.searchsorted(bins, Z, side="right").astype(np.min_scalar_type(len(S)))
+
+
+def _as_source(X, lod=False, pool="mode", like=None):
+    """Get (rasterizable) source for `X`, and whether to render it with `lod`.
+
+    If `like` is a `_BandedRaster`, then `X` is taken to be bands (of the same form).
+    """
+    if isinstance(like, _BandedRaster) and not hasattr(X, "tile"):
+        X = _BandedRaster(X, like.lower)
+    if _issparse(X):
+        X = _SparseRaster(X)
+    if hasattr(X, "tile"):
+        return X, True
+    return _Pyramid(np.asarray(X), pool), lod
+
+
+def _level_cmap(S, cmap):
+    """Get `ListedColormap` with a colour for each level in `S`."""
+    if cmap == "coolwarm":
+        # Ensure 0 corresponds to .5
+        neg = np.linspace(0, 0.5, np.sum(S < 0) + 1)[:-1]
+        pos = np.linspace(0.5, 1, np.sum(S > 0) + 1)[1:]
+        xx = np.concatenate([neg, [0.5] * np.sum(S == 0), pos])
+    else:
+        xx = np.linspace(0, 1, len(S))
+    return mpl.colors.ListedColormap(plt.get_cmap(cmap)(xx))
+
+
+class DiscreteMatshow:
+    """Image and colorbar made by `matshow_discrete`.
+
+    Unpacks as `(im, cb)`. Use `set_data` to show the next frame of a sequence.
+    """
+
+    def __init__(self, X, fig_ax, cmap, mode, ndigits, lod, pool, max_levels):
+        if isinstance(fig_ax, str):
+            fig, ax = freshfig(fig_ax)
+        elif fig_ax is None:
+            fig, ax = freshfig("matshow_discrete")
+        else:
+            fig, ax = fig_ax
+
+        source, lod = _as_source(X, lod, pool)
+        S = None
+        if mode == "set":
+            # Get unique, sorted list of values (and the index of each element)
+            if lod:
+                S = _levels(source.blocks(), ndigits, max_levels)
+            else:
+                S = _levels(source.blocks(), ndigits, max_levels, return_index=True)
+                if S is not None:
+                    S, index = S
+            if S is None:
+                warn(f"More than {max_levels} unique values. Using mode='linear'.")
+                mode = "linear"
+
+        # Range (from the levels, if possible, to avoid another pass over `X`)
+        m, M = (S[0], S[-1]) if S is not None else _minmax(source.blocks())
+
+        # Default cmap
+        if cmap is None:
+            if M == 0:
+                cmap = "cool"
+            elif m == 0:
+                cmap = "autumn"
+            elif m < 0 and M > 0:
+                cmap = "coolwarm"
+            else:
+                cmap = "jet"
+
+        self.fig, self.ax = fig, ax
+        self.cmap, self.mode, self.ndigits = cmap, mode, ndigits
+        self.lod, self.pool, self.max_levels = lod, pool, max_levels
+
+        if mode == "set":
+            self.S = S
+            # The image holds the level index, to be looked up in the cmap
+            kws = dict(cmap=_level_cmap(S, cmap), norm=self._norm())
+            if lod:
+                im = _matshow(ax, source, lod, self._level_index, **kws)
+            else:
+                im = ax.matshow(index, **kws)
+            cb = fig.colorbar(im, ticks=np.arange(len(S)), format=self._formatter())
+
+        elif mode == "linear":
+            self.nlevels = 11
+            kws = dict(cmap=plt.get_cmap(cmap, self.nlevels))
+            im = _matshow(ax, source, lod, **kws, **self._clim(m, M))
+            cb = fig.colorbar(im, ticks=np.linspace(m, M, self.nlevels))
+
+        else:
+            raise ValueError("Invalid mode.")
+
+        self.im, self.cb = im, cb
+
+    def __iter__(self):
+        return iter((self.im, self.cb))
+
+    def __getitem__(self, i):
+        return (self.im, self.cb)[i]
+
+    def __len__(self):
+        return 2
+
+    def _norm(self):
+        return mpl.colors.NoNorm(-0.5, len(self.S) - 0.5)
+
+    def _formatter(self):
+        S = self.S
+        return matplotlib.ticker.FuncFormatter(
             lambda x, idx: "None" if idx is None else "%.2f" % S[idx]
         )  # type: ignore
-        # Create cmap and norm
-        if cmap == "coolwarm":
-            # Ensure 0 corresponds to .5
-            neg = np.linspace(0, 0.5, np.sum(S < 0) + 1)[:-1]
-            pos = np.linspace(0.5, 1, np.sum(S > 0) + 1)[1:]
-            xx = np.concatenate([neg, [0.5], pos])
-        else:
-            xx = np.linspace(0, 1, len(S))
-        cmap = plt.get_cmap(cmap)(xx)
-        cmap = mpl.colors.ListedColormap(cmap)
-        norm = mpl.colors.BoundaryNorm(bins, cmap.N)
-
-        im = ax.matshow(X, cmap=cmap, norm=norm)
-        cb = fig.colorbar(im, ticks=ticks, format=formatter)
-
-    elif mode == "linear":
-        nlevels = 11
-        ticks = np.linspace(m, M, nlevels)
-        cmap = plt.get_cmap(cmap, nlevels)
-        im = ax.matshow(
-            X,
-            cmap=cmap,
-            # Center outer ticks by stretching map
+
+    def _level_index(self, Z):
+        return _level_index(self.S, Z)
+
+    def _clim(self, m, M):
+        self.m, self.M = m, M
+        ticks = np.linspace(m, M, self.nlevels)
+        # Center outer ticks by stretching map
+        return dict(
             vmin=1.5 * ticks[0] - 0.5 * ticks[1],
             vmax=1.5 * ticks[-1] - 0.5 * ticks[-2],
         )
-        cb = fig.colorbar(im, ticks=ticks)
 
-    else:
-        raise ValueError("Invalid mode.")
+    def set_data(self, X):
+        """Show `X` (of the same kind as the first frame), reusing image and colorbar.
+
+        In `mode="set"`, the levels of `X` are added to the existing ones,
+        and the colormap and colorbar are only rebuilt if the level set changes.
+        Beyond `max_levels`, values are shown with their nearest existing level.
+        Returns the image (as a tuple), as for `FuncAnimation`.
+        """
+        im, cb = self
+        like = im.lod.source if self.lod else None
+        source, lod = _as_source(X, self.lod, self.pool, like)
+        if lod != self.lod:
+            raise ValueError("The frame is not of the same kind as the first one.")
+
+        if self.mode == "set":
+            if lod:
+                s = _levels(source.blocks(), self.ndigits)
+            else:
+                s, index = _levels(source.blocks(), self.ndigits, return_index=True)
+            S = np.union1d(self.S, s)
+            if len(S) > self.max_levels:
+                warn(f"More than {self.max_levels} unique values. Not adding new ones.")
+            elif len(S) > len(self.S):
+                self.S = S
+                im.set_cmap(_level_cmap(S, self.cmap))
+                im.set_norm(self._norm())
+                cb.update_normal(im)
+                cb.set_ticks(np.arange(len(S)))
+                cb.formatter = self._formatter()
+            if not lod:
+                # Convert from index of levels of `X` to index of all levels
+                index = self._level_index(s)[index]
+
+        else:
+            m, M = _minmax(source.blocks())
+            if m < self.m or M > self.M:
+                m, M = min(m, self.m), max(M, self.M)
+                im.set_clim(**self._clim(m, M))
+                cb.set_ticks(np.linspace(m, M, self.nlevels))
+
+        if lod:
+            im.lod.source = source
+            im.lod.update()
+        elif self.mode == "set":
+            im.set_data(index)
+        else:
+            im.set_data(source.level(1))
+        return (im,)
+
+
+def matshow_discrete(
+    X,
+    fig_ax=None,
+    cmap=None,
+    mode="set",
+    ndigits=8,
+    lod=False,
+    pool="mode",
+    max_levels=256,
+):
+    """Do matshow, add **discrete colorbar**.
+
+    Inspired by https://stackoverflow.com/a/60870122
+
+    With `mode="set"`, each unique value (rounded to `ndigits`) gets its own colour.
+    The image then holds the index of the level of each element, which is
+    looked up in the colormap (an RGBA table, without any re-normalization).
+    If there are more than `max_levels` unique values, `mode="linear"` is used.
+
+    For huge matrices (including `np.memmap`s), use `lod=True` (level of detail).
+    Then only the part of `X` that is in view is shown, pooled (see `pool`:
+    `"mode"`, `"maxabs"` or `"mean"`) to the resolution of the screen,
+    and this gets recomputed when the axes limits change.
+
+    `X` may also be a `scipy.sparse` matrix, which is never densified:
+    the levels are found from its nonzeros (plus 0, for the structural zeros),
+    which are rasterized straight to (a view-linked) screen-resolution image.
 
-    return im, cb
+    Returns a `DiscreteMatshow`, which unpacks as `(image, colorbar)`,
+    and whose `set_data` shows the next frame of a sequence (e.g. an animation).
+
+    Example:
+    >>> from scipy import sparse
+    >>> D = sparse.diags([1, -2, 1], [-1, 0, 1], shape=(9, 9))
+    >>> image, colorbar = matshow_discrete(D)
 
+    >>> X = np.random.randint(-2, 3, (3000, 2000))
+    >>> image, colorbar = matshow_discrete(X, lod=True)
+    >>> image.get_array().shape < X.shape
+    True
 
-def matshow_banded(bands, fig_ax=None, lower=True):
+    >>> frames = matshow_discrete(np.eye(4))
+    >>> for k in range(1, 4):
+    ...     _ = frames.set_data(k * np.eye(4))
+    >>> frames.S
+    array([0., 1., 2., 3.])
+    """
+    return DiscreteMatshow(X, fig_ax, cmap, mode, ndigits, lod, pool, max_levels)
+
+
+def matshow_banded(bands, fig_ax=None, lower=True, **kwargs):
     """Plot matrix with `bands` as in `solveh_banded`, using `matshow_discrete`.
 
+    The (symmetric) matrix is never formed: the levels are found from the bands,
+    and only the entries in view are rasterized (to screen resolution),
+    so that the cost is `O(m * len(bands))`. Also see `matshow_discrete`.
+    The frames passed to `set_data` (of the returned object) are also bands.
+
     Example:
     >>> bands = np.zeros((2, 10-2))
     >>> bands[0] = 2
     >>> bands[1, :-1] = -1
     >>> image, colorbar = matshow_banded(bands)
-    """
-    if not lower:
-        raise NotImplementedError
-
-    m = bands.shape[-1]
-    D = np.zeros((m,) * 2)
-    for i, band in enumerate(bands):
-        c = 1 if i else 0.5
-        D += c * np.diag(band[: m - i], k=i)
-    D += D.T
 
-    return matshow_discrete(D, fig_ax)
+    >>> bands = np.zeros((2, 10**5))
+    >>> bands[0, 1:] = -1
+    >>> bands[1] = 2
+    >>> image, colorbar = matshow_banded(bands, lower=False)
+    """
+    return matshow_discrete(_BandedRaster(bands, lower), fig_ax, **kwargs)
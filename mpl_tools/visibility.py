@@ -1,46 +1,401 @@
 """Toggle visisbility of plot elements on/off. Provide checkmarks for it."""
 
+import contextlib
 import itertools
+import re
 import textwrap
-import warnings
 
 import matplotlib as mpl
 import numpy as np
 from matplotlib import pyplot as plt
 from matplotlib import transforms as mtransforms
-from matplotlib.widgets import CheckButtons
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.collections import LineCollection
+from matplotlib.widgets import Button, CheckButtons, TextBox
+
+from mpl_tools import is_using_interactive_backend
+from mpl_tools.misc import flush
+
+
+@contextlib.contextmanager
+def _no_autodraw(fig):
+    """Stop `fig` from (auto-)drawing when its artists get stale (in `plt.ion` mode)."""
+    callback, fig.stale_callback = fig.stale_callback, None
+    try:
+        yield
+    finally:
+        fig.stale_callback = callback
+
+
+def _can_blit(fig):
+    if not fig.canvas.supports_blit:
+        return False
+    try:
+        return is_using_interactive_backend()
+    except AttributeError:  # mpl < 3.9 has no backend_registry
+        return mpl.get_backend() in mpl.rcsetup.interactive_bk
+
+
+class _Blitter:
+    """Redraw (only) the toggleable `artists` of `ax`, by blitting.
+
+    The background (i.e. the axes without the artists, nor the legend) is rendered
+    upon the first `update` after each full draw, with the artists hidden.
+    The artists (and the legend, to keep it on top) are then drawn onto it.
+    """
+
+    def __init__(self, ax, artists=()):
+        self.ax = ax
+        self.artists = []
+        self.background = None
+        self._drawing = False
+        ax.figure.canvas.mpl_connect("draw_event", self._invalidate)
+        self.add(artists)
+
+    def add(self, artists):
+        new = [a for a in artists if a not in self.artists]
+        if new:
+            self.artists = sorted(self.artists + new, key=lambda a: a.get_zorder())
+            self.background = None
+
+    def _invalidate(self, _):
+        if not self._drawing:
+            self.background = None
+
+    def update(self):
+        canvas = self.ax.figure.canvas
+        # Keep legend on top (it must then also be excluded from the background)
+        artists = self.artists + [self.ax.get_legend()] * bool(self.ax.get_legend())
+        if self.background is None:
+            visible = [a.get_visible() for a in artists]
+            with _no_autodraw(self.ax.figure):
+                for a in artists:
+                    a.set_visible(False)
+                self._drawing = True
+                try:
+                    canvas.draw()
+                finally:
+                    self._drawing = False
+                    for a, v in zip(artists, visible):
+                        a.set_visible(v)
+            self.background = canvas.copy_from_bbox(self.ax.bbox)
+        else:
+            canvas.restore_region(self.background)
+        for a in artists:
+            self.ax.draw_artist(a)
+        canvas.blit(self.ax.bbox)
+
+
+def _get_blitter(ax, artists):
+    """Get the `_Blitter` of `ax` (create if needed), and add `artists` to it."""
+    if not hasattr(ax, "_visibility_blitter"):
+        ax._visibility_blitter = _Blitter(ax)
+    ax._visibility_blitter.add(artists)
+    return ax._visibility_blitter
+
+
+class _Line2Ds:
+    """List of `Line2D`s, with the interface (used by `LineSelector`) of `LineSet`."""
+
+    def __init__(self, handles):
+        self.artists = handles
+
+    def __len__(self):
+        return len(self.artists)
+
+    def set_visible(self, i, visible):
+        """Set visibility of line(s) `i` (index or index array)."""
+        i, visible = np.broadcast_arrays(i, visible)
+        for j, v in zip(i.ravel(), visible.ravel()):
+            self.artists[j].set_visible(bool(v))
+
+    def bounds(self, i=None):
+        """Bounds of line `i` (or all lines)."""
+        if i is None:
+            return np.array([_line_bounds(lh) for lh in self.artists]).reshape(-1, 6)
+        return _line_bounds(self.artists[i])
+
+
+class LineSet:
+    """Many lines, `Y[i]` vs. `x`, drawn as a single `LineCollection`.
+
+    The visibility, colour and label of each line are held in arrays,
+    and toggling a line merely sets its alpha, avoiding the overhead
+    of one artist per line. Use `toggle_lines(lines=...)` for checkbuttons.
+
+    Example
+    -------
+    >>> fig, ax = plt.subplots()
+    >>> lines = LineSet(ax, np.arange(100), np.random.randn(10**4, 100).cumsum(1))
+    >>> lines.set_visible(slice(10, None), False)
+    >>> selector = toggle_lines(lines=lines)
+    """
+
+    def __init__(self, ax, x, Y, labels=None, colors=None, **kwargs):
+        Y = np.atleast_2d(Y)
+        x = np.broadcast_to(x, Y.shape)
+        N = len(Y)
+        if labels is None:
+            labels = [str(i) for i in range(N)]
+        if colors is None:
+            cycle = mpl.rcParams["axes.prop_cycle"].by_key()["color"]
+            colors = [cycle[i % len(cycle)] for i in range(N)]
+
+        self.ax = ax
+        self.labels = list(labels)
+        # A collection-level alpha would override that of the hidden lines
+        self.colors = mpl.colors.to_rgba_array(colors, kwargs.pop("alpha", None))
+        self.visible = np.ones(N, dtype=bool)
+        self._bounds = _data_bounds(x, Y)
+        self.collection = LineCollection(
+            np.stack([x, Y], -1), colors=self.colors, **kwargs
+        )
+        ax.add_collection(self.collection)
+        ax.autoscale_view()
+
+    def __len__(self):
+        return len(self.labels)
+
+    @property
+    def artists(self):
+        return [self.collection]
+
+    def set_visible(self, i, visible):
+        """Set visibility of line(s) `i` (index, slice, mask...)."""
+        self.visible[i] = visible
+        rgba = self.colors.copy()
+        rgba[~self.visible, 3] = 0
+        self.collection.set_color(rgba)
+
+    def bounds(self, i=None):
+        """Bounds of line `i` (or all lines)."""
+        return self._bounds if i is None else self._bounds[i]
+
+
+class LineSelector:
+    """Checkbuttons (one page at a time) to toggle visibility of `lines`.
+
+    Made by `toggle_lines`. The `lines` are a `LineSet`, or a list of `Line2D`s.
+    They are referred to by their index
+    (not their label, which may be repeated), so lookups are O(1),
+    and only the checkbuttons of the current page are drawn.
+    If there are more lines than `per_page`, buttons to change page,
+    and a text box to filter (by substring of the labels) are added.
+    """
+
+    def __init__(
+        self,
+        ax,
+        lines,
+        labels,
+        colors,
+        visible,
+        rect,
+        per_page,
+        txtsize=None,
+        autoscl=True,
+    ):
+        self.ax = ax
+        self.lines = lines if isinstance(lines, LineSet) else _Line2Ds(lines)
+        self.labels = labels
+        self.colors = colors
+        # NB: shared with (not copied from) `LineSet.visible`
+        self.visible = np.asarray(visible, dtype=bool)
+        self.per_page = per_page
+        self.txtsize = txtsize
+        self.autoscl = autoscl
+        self.page = 0
+        self.shown = np.arange(len(lines))  # indices passing the filter
+        self.refresh()
+        # Attach, so that `set_viz` goes through (and updates) the selector
+        if isinstance(lines, LineSet):
+            lines.selector = self
+        else:
+            ax._line_selector = self
+
+        fig = ax.figure
+        x, y, W, H = rect
+        self.rax = fig.add_axes(rect)
+        if len(lines) > per_page:
+            # Paging
+            h = 0.05
+            self.prev = Button(fig.add_axes([x, y - h - 0.01, W / 2, h]), "<")
+            self.next = Button(fig.add_axes([x + W / 2, y - h - 0.01, W / 2, h]), ">")
+            self.prev.on_clicked(lambda _: self.set_page(self.page - 1))
+            self.next.on_clicked(lambda _: self.set_page(self.page + 1))
+            # Filtering
+            self.filter = TextBox(fig.add_axes([x, y + H + 0.05, W, h]), "", "")
+            self.filter.on_text_change(self.set_filter)
+        self.set_page(0)
+
+    @property
+    def n_pages(self):
+        return max(1, -(-len(self.shown) // self.per_page))
+
+    @property
+    def page_indices(self):
+        """Indices of the lines on the current page."""
+        return self.shown[self.page * self.per_page :][: self.per_page]
+
+    def set_filter(self, text):
+        """Only list the lines whose label contains `text`."""
+        text = text.lower()
+        self.shown = np.array(
+            [i for i, lbl in enumerate(self.labels) if text in lbl.lower()], dtype=int
+        )
+        self.set_page(0)
+
+    def set_page(self, page):
+        """Show the checkbuttons of `page`."""
+        self.page = int(np.clip(page, 0, self.n_pages - 1))
+        inds = self.page_indices
+        self.rax.clear()
+        if not len(inds):
+            self.check = None
+            self.rax.set(xticks=[], yticks=[])
+            self.rax.text(0.5, 0.5, "no match", ha="center", va="center")
+            self.ax.figure.canvas.draw_idle()
+            return
+        self.check = CheckButtons(
+            self.rax,
+            [self.labels[i] for i in inds],
+            self.visible[inds],
+            label_props=dict(
+                color=[self.colors[i] for i in inds],
+                **({"fontsize": [self.txtsize] * len(inds)} if self.txtsize else {}),
+            ),
+            frame_props=dict(facecolor=[self.colors[i] for i in inds], lw=0),
+        )
+        self.check.on_clicked(self._clicked)
+        if self.n_pages > 1:
+            self.rax.set_title(f"{self.page + 1}/{self.n_pages}", fontsize="small")
+        self.ax.figure.canvas.draw_idle()
+
+    def _clicked(self, _label):
+        # Find the changed checkbox (the label might not be unique)
+        inds = self.page_indices
+        status = np.array(self.check.get_status(), dtype=bool)
+        for i in inds[status != self.visible[inds]]:
+            self.set_visible(i, status[inds == i][0])
+
+    def refresh(self):
+        """Recompute the (cached) bounds of all lines, e.g. if their data changed."""
+        bounds = self.lines.bounds().copy()
+        bounds[~self.visible] = _NO_BOUNDS
+        self.bounds = _BoundsTree(bounds)
+
+    def _sync_checks(self):
+        """Set the checkbuttons (of the page) to `visible`. Returns if any changed."""
+        check = self.check
+        if check is None:
+            return False
+        inds = self.page_indices
+        status = np.array(check.get_status(), dtype=bool)
+        changed = np.flatnonzero(status != self.visible[inds])
+        check.eventson = check.drawon = False
+        try:
+            for k in changed:
+                check.set_active(k)
+        finally:
+            check.eventson = check.drawon = True
+        return len(changed) > 0
+
+    def set_visible(self, i, visible, legend=False, autoscl=None):
+        """Set visibility of line(s) with index `i` (int or index array).
+
+        Also updates the checkbuttons, and (if `legend`) the legend.
+        Redraws (once) by blitting (if supported), unless anything else changed.
+        """
+        ax = self.ax
+        if autoscl is None:
+            autoscl = self.autoscl
+        inds, visible = (a.ravel() for a in np.broadcast_arrays(i, visible))
+        lims = ax.viewLim.frozen()
+        with _no_autodraw(ax.figure):
+            self.visible[inds] = visible
+            self.lines.set_visible(inds, visible)
+            if len(inds) > len(self.lines) // 8:
+                self.refresh()
+            else:
+                for j, v in zip(inds, visible):
+                    self.bounds[j] = self.lines.bounds(j) if v else _NO_BOUNDS
+            if autoscl:
+                _set_datalim(ax, self.bounds.root)
+            checks_changed = self._sync_checks()
+            if legend and isinstance(self.lines, _Line2Ds):
+                hs = [self.lines.artists[j] for j in inds]
+                ml = _get_legend(ax, hs)
+                ml.update([h for h in hs if h in ml])
+        unchanged = np.array_equal(ax.viewLim.get_points(), lims.get_points())
+        if unchanged and not (checks_changed or legend) and _can_blit(ax.figure):
+            _get_blitter(ax, self.lines.artists).update()
+        else:
+            ax.figure.canvas.draw_idle()
 
 
 def toggle_lines(
-    ax=None, autoscl=True, numbering=False, txtwidth=15, txtsize=None, state=None
+    ax=None,
+    autoscl=True,
+    numbering=False,
+    txtwidth=15,
+    txtsize=None,
+    state=None,
+    per_page=20,
+    lines=None,
 ):
     """Make checkbuttons to toggle visibility of each line in current plot.
 
+    Alternatively, toggle the `lines` of a `LineSet` (then `ax` is not used).
+
     - `autoscl`  : Rescale axis limits as required by currently visible lines.
     - `numbering`: Add numbering to labels.
     - `txtwidth` : Wrap labels to this length.
+    - `per_page` : Max. number of checkbuttons to show at once.
+      If there are more lines, then they get paged, and can be filtered.
 
     The state of checkboxes can be inquired by
     >>> OnOff = [lh.get_visible() for lh in # doctest: +SKIP
     ...          ax.findobj(lambda x: isinstance(x,mpl.lines.Line2D))[::2]]
 
+    or from the `visible` attribute of the returned `LineSelector`.
+
     See History-Matching tutorial for a solution using ipywidgets,
     ie. that is compatible with Jupyter notebooks. TODO: merge?
+
+    Example
+    -------
+    >>> fig, ax = plt.subplots()
+    >>> for i in range(50):
+    ...     _ = ax.plot(np.arange(9) * i, label=f"member {i}")
+    >>> selector = toggle_lines(ax, numbering=True)
+    >>> selector.set_filter("member 4")
+    >>> len(selector.shown)
+    11
     """
-    if ax is None:
+    if lines is not None:
+        ax = lines.ax
+    elif ax is None:
         ax = plt.gca()
     if txtsize is None:
         txtsize = mpl.rcParams["font.size"]
 
     # Get lines and their properties
-    lines = {"handle": list(ax.get_lines())}
-    for prop in ["label", "color", "visible"]:
-        lines[prop] = [plt.getp(x, prop) for x in lines["handle"]]
-
-    # Rm those that start with _
-    not_ = [not x.startswith("_") for x in lines["label"]]
-    for prop in lines:
-        lines[prop] = list(itertools.compress(lines[prop], not_))
+    if lines is not None:
+        lines = {
+            "handle": lines,
+            "label": lines.labels,
+            "color": list(lines.colors),
+            "visible": lines.visible,
+        }
+    else:
+        lines = {"handle": list(ax.get_lines())}
+        for prop in ["label", "color", "visible"]:
+            lines[prop] = [plt.getp(x, prop) for x in lines["handle"]]
+
+        # Rm those that start with _
+        not_ = [not x.startswith("_") for x in lines["label"]]
+        for prop in lines:
+            lines[prop] = list(itertools.compress(lines[prop], not_))
     N = len(lines["handle"])
 
     # Adjust labels
@@ -53,100 +408,461 @@ def toggle_lines(
     if state is not None:
         state = np.array(state).astype(bool)
         lines["visible"] = state
-        for i, x in enumerate(state):
-            lines["handle"][i].set_visible(x)
+        if isinstance(lines["handle"], LineSet):
+            lines["handle"].set_visible(slice(None), state)
+            lines["visible"] = lines["handle"].visible
+        else:
+            for i, x in enumerate(state):
+                lines["handle"][i].set_visible(x)
 
     # Setup buttons
     # When there's many, the box-sizing is awful, but difficult to fix.
     W = 0.23 * txtwidth / 15 * txtsize / 10
-    nBreaks = sum(x.count("\n") for x in lines["label"])  # count linebreaks
-    H = min(1, 0.05 * (N + nBreaks))
-    plt.subplots_adjust(left=W + 0.12, right=0.97)
-    rax = plt.axes([0.05, 0.5 - H / 2, W, H])
-    check = CheckButtons(rax, lines["label"], lines["visible"])
-
-    # Adjust button style. `rectangles` was removed in mpl 3.7; use `patches`.
-    patches = getattr(check, "rectangles", None) or check.ax.patches[1::3]
-    for i in range(N):
-        patches[i].set(lw=0, facecolor=lines["color"][i])
-        check.labels[i].set(color=lines["color"][i])
-        if txtsize:
-            check.labels[i].set(size=txtsize)
-
-    # Callback
-    def toggle_visible(label):
-        ind = lines["label"].index(label)
-        handle = lines["handle"][ind]
-        vs = not lines["visible"][ind]
-        handle.set_visible(vs)
-        lines["visible"][ind] = vs
-        if autoscl:
-            _autoscale_based_on(
-                ax, list(itertools.compress(lines["handle"], lines["visible"]))
-            )
-        plt.draw()
-
-    check.on_clicked(toggle_visible)
+    nLines = min(N, per_page)
+    nBreaks = max([x.count("\n") for x in lines["label"]], default=0)  # linebreaks
+    H = min(0.8, 0.05 * nLines * (1 + nBreaks))
+    ax.figure.subplots_adjust(left=W + 0.12, right=0.97)
+    selector = LineSelector(
+        ax,
+        lines["handle"],
+        lines["label"],
+        lines["color"],
+        lines["visible"],
+        [0.05, 0.5 - H / 2, W, H],
+        per_page,
+        txtsize,
+        autoscl,
+    )
 
     # Return focus
     plt.sca(ax)
 
     # Must return (and be received) so as not to expire.
-    return check
+    return selector
+
+
+def _data_bounds(x, y):
+    """Get `[xmin, ymin, xminpos, yminpos, xmax, ymax]` of data (along last axis)."""
+    x, y = (np.asarray(a, dtype=float) for a in (x, y))
+
+    def fmin(a):
+        return np.fmin.reduce(a, -1, initial=np.inf)
+
+    def fmax(a):
+        return np.fmax.reduce(a, -1, initial=-np.inf)
+
+    def pos(a):
+        return np.where(a > 0, a, np.inf)
+
+    bounds = [fmin(x), fmin(y), fmin(pos(x)), fmin(pos(y)), fmax(x), fmax(y)]
+    return np.stack(bounds, -1)
+
+
+def _line_bounds(lh):
+    """Get `_data_bounds` of line `lh`.
+
+    Cached (on the line) until its data gets (re-)set.
+    """
+    x, y = lh.get_xdata(orig=True), lh.get_ydata(orig=True)
+    cache = getattr(lh, "_data_bounds", None)
+    if cache is None or cache[0] is not x or cache[1] is not y:
+        lh._data_bounds = cache = x, y, _data_bounds(*lh.get_data(orig=False))
+    return cache[2]
+
+
+def _join_bounds(a, b):
+    """Join `_line_bounds` (along the last axis)."""
+    return np.concatenate(
+        [np.fmin(a[..., :4], b[..., :4]), np.fmax(a[..., 4:], b[..., 4:])], -1
+    )
+
+
+_NO_BOUNDS = np.array([np.inf] * 4 + [-np.inf] * 2)
+
+
+class _BoundsTree:
+    """Segment tree of `_line_bounds`, for O(log N) updates of their join.
+
+    The leaf of a line that is not visible is set to `_NO_BOUNDS`.
+    """
+
+    def __init__(self, bounds):
+        self.size = size = 1 << max(0, len(bounds) - 1).bit_length()
+        self.tree = np.tile(_NO_BOUNDS, (2 * size, 1))
+        self.tree[size : size + len(bounds)] = bounds
+        # Build bottom-up, one level at a time
+        k = size
+        while k > 1:
+            k //= 2
+            kids = self.tree[2 * k : 4 * k]
+            self.tree[k : 2 * k] = _join_bounds(kids[0::2], kids[1::2])
+
+    def __setitem__(self, i, bounds):
+        k = i + self.size
+        self.tree[k] = bounds
+        while k > 1:
+            k //= 2
+            self.tree[k] = _join_bounds(self.tree[2 * k], self.tree[2 * k + 1])
+
+    @property
+    def root(self):
+        return self.tree[1]
 
 
 # https://stackoverflow.com/a/7396313
-def _autoscale_based_on(ax, line_handles):
-    """Autoscale axis based (only) on `line_handles`."""
-    ax.dataLim = mtransforms.Bbox.unit()
-    for iL, lh in enumerate(line_handles):
-        xy = np.vstack(lh.get_data()).T
-        ax.dataLim.update_from_data_xy(xy, ignore=(iL == 0))
+def _set_datalim(ax, bounds):
+    """Set `ax.dataLim` from (joined) `_line_bounds`, and autoscale."""
+    x0, y0, xp, yp, x1, y1 = bounds
+    if x0 <= x1 and y0 <= y1:
+        # Also sets minpos (used for log scales)
+        corners = np.array([[x0, y0], [x1, y1], [xp, yp]])
+        ax.dataLim.update_from_data_xy(corners[np.isfinite(corners).all(1)], True)
+    else:
+        ax.dataLim = mtransforms.Bbox.unit()
     ax.autoscale_view()
 
 
+class _ManagedLegend:
+    """Legend of `ax`, whose rows get hidden/shown (rather than rebuilt).
+
+    Hidden rows are skipped by the legend's packers, so the legend re-flows
+    at draw time, without re-creating its handles and texts.
+    Made (and stored as `ax._managed_legend`) by `_get_legend`.
+    """
+
+    def __init__(self, ax):
+        handles, labels = ax.get_legend_handles_labels()
+        self.legend = leg = ax.legend(handles, labels)
+        self.columns = leg._legend_handle_box.get_children()
+        rows = [(row, col) for col in self.columns for row in col.get_children()]
+        # Unsupported handles do not get a row
+        handles = [h for h, lh in zip(handles, leg.legend_handles) if lh is not None]
+        self.rows = {id(h): rc for h, rc in zip(handles, rows)}
+        self.update(handles)
+
+    def __contains__(self, handle):
+        return id(handle) in self.rows
+
+    def update(self, handles):
+        """Show/hide the rows of `handles` according to their visibility."""
+        cols = set()
+        for h in handles:
+            row, col = self.rows[id(h)]
+            row.set_visible(h.get_visible())
+            cols.add(col)
+        # Empty columns cannot be packed
+        for col in cols:
+            col.set_visible(any(c.get_visible() for c in col.get_children()))
+        self.legend.set_visible(any(c.get_visible() for c in self.columns))
+
+
+def _get_legend(ax, handles):
+    """Get the `_ManagedLegend` of `ax`. (Re)built if any of `handles` is new."""
+    ml = getattr(ax, "_managed_legend", None)
+    if (
+        ml is None
+        or ml.legend is not ax.get_legend()
+        or not all(h in ml for h in handles if not h.get_label().startswith("_"))
+    ):
+        ml = ax._managed_legend = _ManagedLegend(ax)
+    return ml
+
+
 def toggle_viz(*handles, prompt=False, legend=False, pause=0.0):
-    """Toggle visibility of the graphics with handle `handles`."""
+    """Toggle visibility of the graphics with handle `handles`.
+
+    If `legend`, the rows of `handles` in the legend of their axes are hidden/shown.
+    Redraws by blitting (if supported), unless `legend`.
+    With `pause`, the GUI event loop is run (if interactive backend) for that long.
+    """
     are_viz = []
-    for h in handles:
-        # Core functionality: turn on/off
-        is_viz = not h.get_visible()
-        h.set_visible(is_viz)
-        are_viz += [is_viz]
-
-        # Legend updating. Basic version: works by
-        #  - setting line's label (to /'_nolegend_' if off)
-        #  - re-calling legend()
+    figs = {h.figure for h in handles}
+    with contextlib.ExitStack() as stack:
+        for fig in figs:
+            stack.enter_context(_no_autodraw(fig))
+        for h in handles:
+            # Core functionality: turn on/off
+            is_viz = not h.get_visible()
+            h.set_visible(is_viz)
+            are_viz += [is_viz]
+
         if legend:
-            if is_viz:
-                try:
-                    h.set_label(h.actual_label)
-                except AttributeError:
-                    pass
-            else:
-                h.actual_label = h.get_label()
-                h.set_label("_nolegend_")
-            # Legend refresh
-            ax = h.axes
-            with warnings.catch_warnings():
-                warnings.simplefilter("error", category=UserWarning)
-                try:
-                    ax.legend()
-                except UserWarning:
-                    # If all labels are '_nolabel_' then ax.legend() throws warning,
-                    # and quits before refreshing.
-                    # => Refresh by creating/rm another legend.
-                    ax.legend("TMP").remove()
+            for ax in {h.axes for h in handles} - {None}:
+                hs = [h for h in handles if h.axes is ax]
+                ml = _get_legend(ax, hs)
+                ml.update([h for h in hs if h in ml])
+
+    # Redraw
+    for fig in figs:
+        axs = {h.axes for h in handles if h.figure is fig}
+        # Figure-level artists (e.g. suptitle) are not blitted
+        if legend or None in axs or not _can_blit(fig):
+            fig.canvas.draw_idle()
+        else:
+            for ax in axs:
+                _get_blitter(ax, [h for h in handles if h.axes is ax]).update()
 
     # Pause at where used (typically sequentially in script)
     if prompt:
         input("Press <Enter> to continue...")
     if pause > 0:
-        plt.pause(pause)
+        for fig in figs:
+            flush(fig, pause / len(figs))
 
     return are_viz
 
 
+def set_viz(select, visible=None, ax=None, lines=None, legend=False, autoscl=False):
+    """Set visibility of a group of lines (of `ax`, or of a `LineSet`) at once.
+
+    The group is selected by `select`, which may be
+
+    - a label pattern (regex, matched by `re.search`),
+    - a predicate (of the `Line2D`, or of the index, for a `LineSet`),
+    - indices or a boolean mask (into the lines of `ax` whose label does not start
+      with "_", i.e. as indexed by `toggle_lines`, or into the `LineSet`).
+
+    If `visible` is None, the visibility of each selected line is toggled.
+    All changes are applied before the legend (if `legend`) and the axes limits
+    (if `autoscl`) are refreshed, and the figure is redrawn, once.
+    If the lines have a `LineSelector` (made by `toggle_lines`), it is updated too.
+    Returns the visibility of all the lines.
+
+    Example
+    -------
+    >>> fig, ax = plt.subplots()
+    >>> for i in range(6):
+    ...     _ = ax.plot(np.arange(9) * i, label=f"{'odd' if i % 2 else 'even'} {i}")
+    >>> set_viz("odd", False, ax, legend=True).astype(int)
+    array([1, 0, 1, 0, 1, 0])
+    >>> set_viz([0, 1], ax=ax, autoscl=True).astype(int)
+    array([0, 1, 1, 0, 1, 0])
+    """
+    if lines is not None:
+        ax = lines.ax
+        selector = getattr(lines, "selector", None)
+        labels = lines.labels
+        state = lines.visible
+    else:
+        if ax is None:
+            ax = plt.gca()
+        selector = getattr(ax, "_line_selector", None)
+        if selector is not None:
+            lines = selector.lines
+        else:
+            lines = _Line2Ds(
+                [lh for lh in ax.get_lines() if not lh.get_label().startswith("_")]
+            )
+        labels = [lh.get_label() for lh in lines.artists]
+        state = np.array([lh.get_visible() for lh in lines.artists], dtype=bool)
+    N = len(lines)
+
+    # Selection
+    if isinstance(select, str):
+        pattern = re.compile(select)
+        inds = [i for i, lbl in enumerate(labels) if pattern.search(lbl)]
+    elif callable(select):
+        items = lines.artists if isinstance(lines, _Line2Ds) else range(N)
+        inds = [i for i, x in enumerate(items) if select(x)]
+    else:
+        inds = np.arange(N)[select]
+    inds = np.asarray(inds, dtype=int).ravel()
+
+    new = ~state[inds] if visible is None else np.full(len(inds), bool(visible))
+    changed = inds[new != state[inds]]
+    new = new[new != state[inds]]
+
+    if selector is not None:
+        selector.set_visible(changed, new, legend, autoscl)
+        return selector.visible.copy()
+
+    with _no_autodraw(ax.figure):
+        lines.set_visible(changed, new)
+        state = state.copy()
+        state[changed] = new
+
+        if legend and isinstance(lines, _Line2Ds):
+            hs = [lines.artists[i] for i in changed]
+            ml = _get_legend(ax, hs)
+            ml.update([h for h in hs if h in ml])
+        if autoscl:
+            bounds = lines.bounds().copy()
+            bounds[~state] = _NO_BOUNDS
+            _set_datalim(ax, _BoundsTree(bounds).root)
+
+    if legend or autoscl or not _can_blit(ax.figure):
+        ax.figure.canvas.draw_idle()
+    elif len(changed):
+        _get_blitter(ax, lines.artists).update()
+    return state
+
+
+def _drawn_after(ax, artists):
+    """Get `artists`, and the others of `ax` drawn after them (as in `Axes.draw`)."""
+    children = [a for a in ax.get_children() if a is not ax.patch]
+    if not (ax.axison and ax.get_frame_on()):
+        children = [a for a in children if a not in ax.spines.values()]
+    if not ax.axison:
+        children = [a for a in children if a not in (ax.xaxis, ax.yaxis)]
+    children.sort(key=lambda a: a.get_zorder())
+    ids = {id(a) for a in artists}
+    first = next((k for k, a in enumerate(children) if id(a) in ids), len(children))
+    return children[first:]
+
+
+class _Layers:
+    """Render `fig` (with Agg) as a cached static layer, with `artists` drawn on top.
+
+    The static layer is the figure without the `artists` (of some axes),
+    nor anything drawn after them (e.g. the spines and legend of their axes).
+    These are then drawn onto it in the same order as in a full draw,
+    which yields byte-identical results, provided only their visibility changes
+    (and the axes do not overlap).
+    """
+
+    def __init__(self, fig, artists, dpi):
+        self.fig = fig
+        self.key = self._key(fig, artists, dpi)
+        self.canvas = _agg_canvas(fig)
+        self.top = []
+        for ax in {a.axes for a in artists}:
+            self.top += _drawn_after(ax, [a for a in artists if a.axes is ax])
+        self.background = None
+
+    @staticmethod
+    def _key(fig, artists, dpi):
+        return dpi, tuple(fig.get_size_inches()), tuple(sorted(map(id, artists)))
+
+    def draw(self):
+        """Render. Returns the canvas (which is also set as `fig.canvas`)."""
+        fig, canvas = self.fig, self.canvas
+        fig.set_canvas(canvas)
+        if self.background is None:
+            visible = [a.get_visible() for a in self.top]
+            with _no_autodraw(fig):
+                for a in self.top:
+                    a.set_visible(False)
+                try:
+                    canvas.draw()
+                finally:
+                    for a, v in zip(self.top, visible):
+                        a.set_visible(v)
+            self.background = canvas.copy_from_bbox(fig.bbox)
+        else:
+            canvas.restore_region(self.background)
+        renderer = canvas.get_renderer()
+        for a in self.top:
+            a.draw(renderer)
+        return canvas
+
+
+def _get_layers(fig, artists, dpi):
+    """Get the `_Layers` of `fig`. Re-made if `artists`, fig. size or `dpi` changed."""
+    layers = getattr(fig, "_save_layers", None)
+    if layers is None or layers.key != _Layers._key(fig, artists, dpi):
+        layers = fig._save_layers = _Layers(fig, artists, dpi)
+    return layers
+
+
+def _agg_canvas(fig):
+    """Set (and return) a new Agg canvas for `fig`, keeping its `_original_dpi`.
+
+    Otherwise (mpl < 3.8) the canvas would reset it to the current dpi.
+    """
+    original_dpi = getattr(fig, "_original_dpi", fig.dpi)
+    canvas = FigureCanvasAgg(fig)
+    fig._original_dpi = original_dpi
+    return canvas
+
+
+_RASTER_EXTS = {"png", "jpg", "jpeg", "tif", "tiff", "webp"}
+
+
+def _savefig_as_drawn(fig):
+    """Check if `savefig` renders `fig` as drawn, i.e. with its own colours."""
+    rc = mpl.rcParams
+    if rc["savefig.transparent"]:
+        return False
+    for key, own in [
+        ("facecolor", fig.get_facecolor()),
+        ("edgecolor", fig.get_edgecolor()),
+    ]:
+        color = rc[f"savefig.{key}"]
+        if not (color == "auto" or np.allclose(mpl.colors.to_rgba(color), own)):
+            return False
+    return True
+
+
+def _savefigs(
+    fig, fname, exts, bbox_inches="tight", pad_inches=0, dpi=None, layers=None
+):
+    """Save `fig` to `f"{fname}.{ext}"` for each of `exts`, rendering it only once.
+
+    The figure is drawn (with Agg) once, which also provides the tight bbox,
+    (snapped to whole pixels, so that cropping equals rendering the bbox).
+    Raster formats are encoded from (a crop of) this buffer, unless `savefig` would
+    render differently (`savefig.transparent/facecolor/edgecolor`).
+    Vector formats are passed the bbox (skipping the extra "tight" draw),
+    with the layout engine disabled (since layout has already been done).
+
+    If `layers` (a list of artists) is given, the raster is made by `_Layers`.
+    """
+    if dpi is None:
+        dpi = mpl.rcParams["savefig.dpi"]
+    if dpi == "figure":
+        dpi = getattr(fig, "_original_dpi", fig.dpi)
+
+    # Render once
+    as_drawn = _savefig_as_drawn(fig)
+    canvas0, dpi0 = fig.canvas, fig.dpi
+    try:
+        # NB: switch canvas before setting the dpi, lest the GUI window be resized
+        if layers is None or not as_drawn:
+            layers = None
+            canvas = _agg_canvas(fig)
+        else:
+            layers = _get_layers(fig, layers, dpi)
+            canvas = layers.canvas
+            fig.set_canvas(canvas)
+        fig.dpi = dpi
+        if layers is None:
+            canvas.draw()
+        else:
+            layers.draw()
+        renderer = canvas.get_renderer()
+        rgba = np.asarray(canvas.buffer_rgba())
+        if bbox_inches == "tight":
+            bbox_inches = fig.get_tightbbox(renderer).padded(pad_inches)
+            p = bbox_inches.get_points() * dpi
+            p = np.array([np.floor(p[0]), np.ceil(p[1])])
+            bbox_inches = mtransforms.Bbox(p / dpi)
+            (x0, y0), (x1, y1) = p.astype(int)
+            H, W = rgba.shape[:2]
+            if 0 <= x0 and 0 <= y0 and x1 <= W and y1 <= H:
+                rgba = rgba[H - y1 : H - y0, x0:x1]
+            else:
+                rgba = None  # bbox exceeds figure
+        elif bbox_inches is not None:
+            rgba = None
+        rgba = None if (rgba is None or not as_drawn) else rgba.copy()
+    finally:
+        fig.dpi = dpi0
+        fig.set_canvas(canvas0)
+
+    engine = fig.get_layout_engine()
+    if engine is not None:
+        fig.set_layout_engine("none")
+    try:
+        for ext in exts:
+            if ext in _RASTER_EXTS and rgba is not None:
+                mpl.image.imsave(f"{fname}.{ext}", rgba, format=ext, dpi=dpi)
+            else:
+                fig.savefig(f"{fname}.{ext}", bbox_inches=bbox_inches, dpi=dpi)
+    finally:
+        if engine is not None:
+            fig.set_layout_engine(engine)
+
+
 def save_toggle(
     *objs,
     exts=("png",),
@@ -155,8 +871,15 @@ def save_toggle(
     dpi=None,
     fig=None,
     pause=0.4,
+    layers=None,
 ):
-    """Save figure. Toggle visibility of `objs`.
+    """Save figure (in each format of `exts`). Toggle visibility of `objs`.
+
+    The figure is only laid out and rendered once for all of `exts`.
+
+    For a sequence of frames, pass `layers`: all of the artists that get toggled.
+    The rest of the figure (which must not change) is then rendered only once,
+    and these artists drawn on top (byte-identical to a full render).
 
     Example::
 
@@ -164,6 +887,10 @@ def save_toggle(
         fig.savepath = Path(__file__).resolve().parent / f"Pics/{fig.get_label()}"
         save_toggle(line1)
         save_toggle(line2)
+
+        # Or, with layer caching
+        for line in lines:
+            save_toggle(line, layers=lines)
     """
     if fig is None:
         fig = objs[0].figure
@@ -174,13 +901,8 @@ def save_toggle(
     if not hasattr(fig, "savepath"):
         fig.savepath = fig.get_label()  # ⇒ PWD
 
-    for ext in exts:
-        fig.savefig(
-            f"{fig.savepath}-{fig.counter}.{ext}",
-            bbox_inches=bbox_inches,
-            pad_inches=pad_inches,
-            dpi=dpi,
-        )
+    fname = f"{fig.savepath}-{fig.counter}"
+    _savefigs(fig, fname, exts, bbox_inches, pad_inches, dpi, layers)
 
     fig.counter += 1
 
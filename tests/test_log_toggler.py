@@ -0,0 +1,39 @@
+"""Test log_toggler.py"""
+import numpy as np
+from matplotlib import pyplot as plt
+
+from mpl_tools.log_toggler import toggle_scale
+
+
+def test_toggle_scale_cache():
+    fig, ax = plt.subplots()
+    (line,) = ax.plot(10.0 ** np.arange(5))
+    toggle_scale(ax)
+    log_lims, log_loc = ax.get_ylim(), ax.yaxis.get_major_locator()
+    toggle_scale(ax)
+    lin_lims = ax.get_ylim()
+    assert lin_lims[0] == 0
+    assert set(ax._scale_cache) == {("log", None), ("linear", None)}
+
+    # Cache hit: the same state is swapped back in
+    toggle_scale(ax)
+    assert ax.get_yscale() == "log"
+    assert ax.get_ylim() == log_lims
+    assert ax.yaxis.get_major_locator() is log_loc
+    assert ax.get_autoscaley_on()  # as upon the first switch to log
+
+    # Data change: cache is reset, and limits recomputed
+    line.set_ydata(10.0 ** np.arange(5, 10))
+    ax.relim()
+    toggle_scale(ax)
+    assert set(ax._scale_cache) == {("linear", None)}
+    toggle_scale(ax)
+    assert ax.get_ylim() != log_lims
+    assert ax.get_ylim()[1] >= 1e9
+    assert ax.yaxis.get_major_locator() is not log_loc
+
+    # New data is autoscaled (in view)
+    ax.plot([1e12, 1e13])
+    fig.canvas.draw()
+    assert ax.get_ylim()[1] >= 1e13
+    plt.close(fig)
@@ -0,0 +1,74 @@
+"""Test place_ax.py"""
+import numpy as np
+from matplotlib import pyplot as plt
+
+from mpl_tools.place_ax import (
+    adjust_position,
+    align_ax_with,
+    anchor_axes,
+    get_legend_bbox,
+    set_ax_size,
+    trans2fig,
+)
+
+
+def test_anchor_axes_to_legend():
+    fig, ax = plt.subplots()
+    ax.plot(np.arange(3), label="line")
+    ax.legend(loc="upper left")
+    bax = fig.add_axes([0.5, 0.5, 0.1, 0.05])
+    anchor_axes(bax, get_legend_bbox(ax), "S+W")
+    draws = []
+    fig.canvas.mpl_connect("draw_event", draws.append)
+    fig.canvas.draw()
+    assert len(draws) == 1  # no nested draws
+    leg = ax.get_legend().get_window_extent()
+    assert np.isclose(bax.bbox.x0, leg.x0)
+    assert bax.bbox.y1 < leg.y0
+    # Re-placed upon resize
+    fig.set_size_inches(3, 3)
+    fig.canvas.draw()
+    leg = ax.get_legend().get_window_extent()
+    assert np.isclose(bax.bbox.x0, leg.x0)
+    plt.close(fig)
+
+
+def test_anchor_axes_to_legend_moving():
+    fig, ax = plt.subplots()
+    ax.plot(np.arange(3), label="line")
+    ax.legend(loc="best")
+    bax = fig.add_axes([0.5, 0.5, 0.1, 0.05])
+    anchor_axes(bax, get_legend_bbox(ax), "S+W")
+    for ylim in [(0, 10), (-10, 2)]:  # legend moves away from the line
+        ax.set_ylim(ylim)
+        fig.canvas.draw()
+        leg = ax.get_legend().get_window_extent()
+        assert np.isclose(bax.bbox.x0, leg.x0)
+        assert bax.bbox.y1 < leg.y0
+    # Moved by set_loc
+    ax.get_legend()._set_loc(3)
+    fig.canvas.draw()
+    assert np.isclose(bax.bbox.x0, ax.get_legend().get_window_extent().x0)
+    plt.close(fig)
+
+
+def test_batch_placement():
+    fig, ax = plt.subplots()
+    ax.set(xlim=(0, 10), ylim=(0, 5))
+    rects = np.random.rand(6, 4) * 5
+    out = trans2fig(ax, rects)
+    assert out.shape == (6, 4)
+    assert np.allclose(out, [trans2fig(ax, r) for r in rects])
+
+    insets = [fig.add_axes(r) for r in out]
+    singles = [fig.add_axes(r) for r in out]
+    set_ax_size(insets, 30, np.arange(6) + 20)
+    adjust_position(insets, x=0.01, h=np.arange(6) / 100)
+    align_ax_with(insets, ax.bbox, "N+W")
+    for i, a in enumerate(singles):
+        set_ax_size(a, 30, i + 20)
+        adjust_position(a, x=0.01, h=i / 100)
+        align_ax_with(a, ax.bbox, "N+W")
+    pos = [[a.get_position().bounds for a in axs] for axs in (insets, singles)]
+    assert np.allclose(*pos)
+    plt.close(fig)
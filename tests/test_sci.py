@@ -0,0 +1,273 @@
+"""Test sci.py"""
+import matplotlib as mpl
+import numpy as np
+import pytest
+from matplotlib import pyplot as plt
+
+from mpl_tools.sci import (
+    CovAccumulator,
+    _BandedRaster,
+    _ellipse_geometry,
+    _pool,
+    _Pyramid,
+    cov_corner,
+    cov_ellipse,
+    cov_ellipses,
+    discretize_cmap,
+    hist2d_with_marginals,
+    matshow_banded,
+    matshow_discrete,
+)
+
+
+def test_ellipse_geometry():
+    L = np.random.randn(50, 2, 2)
+    C = L @ L.swapaxes(-1, -2)
+    w, h, theta = _ellipse_geometry(C)
+    for Ci, wi, hi, ti in zip(C, w, h, theta):
+        vals, vecs = np.linalg.eigh(Ci)
+        assert np.allclose([hi, wi], 2 * np.sqrt(vals))
+        x, y = vecs[:, -1]
+        dt = ti - np.degrees(np.arctan2(y, x))
+        assert np.isclose(np.cos(np.radians(2 * dt)), 1)  # equal modulo 180
+
+
+def test_cov_ellipses():
+    fig, ax = plt.subplots()
+    mu = np.zeros((3, 2))
+    C = np.array([np.eye(2), 4 * np.eye(2), np.diag([9, 1])])
+    ec = cov_ellipses(ax, mu, C)
+    assert np.allclose(ec.get_widths(), [2, 4, 6])
+    assert np.allclose(ec.get_heights(), [2, 4, 2])
+    plt.close(fig)
+
+
+def test_cov_ellipse_set_data():
+    fig, ax = plt.subplots()
+    e = cov_ellipse(ax, (0, 0), np.eye(2))
+    n_patches = len(ax.patches)
+    for k in range(1, 5):
+        e.set_data((k, 0), k**2 * np.eye(2))
+    assert len(ax.patches) == n_patches
+    assert np.allclose(e.get_center(), (4, 0))
+    assert np.isclose(e.get_width(), 8)
+
+    ec = cov_ellipses(ax, np.zeros((2, 2)), np.array([np.eye(2)] * 2))
+    ec.set_data(np.ones((3, 2)), np.array([4 * np.eye(2)] * 3))
+    assert np.allclose(ec.get_widths(), [4, 4, 4])
+    assert np.allclose(ec.get_offsets(), 1)
+    plt.close(fig)
+
+
+def test_pool():
+    X = np.array([[1, 1, 2, -5], [1, 3, 2, 2], [0, 0, 7, 7]])
+    assert np.array_equal(_pool(X, 2, "mode"), [[1, 2], [0, 7]])
+    assert np.array_equal(_pool(X, 2, "maxabs"), [[3, -5], [0, 7]])
+    assert np.allclose(_pool(X, 2, "mean"), [[1.5, 0.25], [0, 7]])
+
+
+def test_pyramid_tiles():
+    X = np.random.randint(0, 4, (300, 200))
+    small = _Pyramid(X, cache_size=1000)
+    big = _Pyramid(X)
+    for args in [(0, 300, 0, 200, 100, 60), (10, 90, 31, 77, 30, 20)]:
+        Z, extent = small.tile(*args)
+        assert np.array_equal(Z, big.tile(*args)[0])
+        assert np.array_equal(extent, big.tile(*args)[1])
+    assert set(small.levels) == {1}  # levels 2 and 4 exceed cache_size
+    assert set(big.levels) == {1, 2}
+    Z, _ = small.tile(0, 300, 0, 200, 10, 10)
+    assert Z.shape == (19, 13) and set(small.levels) == {1, 16}
+
+
+def test_matshow_lod_memmap(tmp_path):
+    X = np.lib.format.open_memmap(tmp_path / "X.npy", "w+", float, (4000, 3000))
+    X[:] = np.arange(3000) % 3
+    fig, ax = plt.subplots()
+    im, _ = matshow_discrete(X, (fig, ax), lod=True)
+    full = im.get_array().shape
+    assert full[0] < X.shape[0] and full[1] < X.shape[1]
+    ax.set(xlim=(9.5, 19.5), ylim=(19.5, 9.5))
+    assert im.get_array().shape == (10, 10)
+    assert np.array_equal(im.get_array(), X[10:20, 10:20])
+    plt.close(fig)
+
+
+def test_matshow_sparse():
+    sparse = pytest.importorskip("scipy.sparse")
+    n = 10**5
+    D = sparse.diags([1, -2, 1], [-1, 0, 1], shape=(n, n), format="csr")
+    fig, ax = plt.subplots()
+    im, cb = matshow_discrete(D, (fig, ax))
+    assert im.get_array().size < 10**7
+    assert len(cb.get_ticks()) == 3  # -2, 0, 1
+    ax.set(xlim=(-0.5, 4.5), ylim=(4.5, -0.5))
+    levels = np.searchsorted([-2, 0, 1], D[:5, :5].toarray())
+    assert np.array_equal(im.get_array(), levels)
+    plt.close(fig)
+
+
+def test_matshow_sparse_empty():
+    sparse = pytest.importorskip("scipy.sparse")
+    D = sparse.diags([1, -2, 1], [-1, 0, 1], shape=(100, 100), format="csr")
+    fig, ax = plt.subplots()
+    im, cb = matshow_discrete(D, (fig, ax))
+    ax.set(xlim=(80, 95), ylim=(20, 5))  # pan onto region without nonzeros
+    assert np.all(im.get_array() == 1)  # level of 0 (among -2, 0, 1)
+    im, cb = matshow_discrete(sparse.csr_matrix((10, 10)), (fig, ax))
+    assert np.array_equal(cb.get_ticks(), [0])
+    plt.close(fig)
+
+
+def test_banded_raster():
+    m = 7
+    lower = np.random.randint(1, 9, (3, m)).astype(float)
+    A = np.zeros((m, m))
+    for k, band in enumerate(lower):
+        A += np.diag(band[: m - k], k)
+    A = np.triu(A) + np.triu(A, 1).T
+    upper = np.zeros_like(lower)
+    for k in range(3):
+        upper[2 - k, k:] = lower[k, : m - k]
+
+    for src in [_BandedRaster(lower), _BandedRaster(upper, lower=False)]:
+        Z, _ = src.tile(0, m, 0, m, 100, 100)
+        assert np.array_equal(Z, A)
+        Z, _ = src.tile(2, 5, 1, 6, 100, 100)
+        assert np.array_equal(Z, A[2:5, 1:6])
+        levels = np.unique(np.concatenate(list(src.blocks())))
+        assert np.array_equal(levels, np.unique(A))
+        Z, _ = src.tile(0, 2, 4, 7, 100, 100)  # outside of the bands
+        assert np.array_equal(Z, np.zeros((2, 3)))
+
+    # Frames of bands
+    fig, ax = plt.subplots()
+    frames = matshow_banded(upper, (fig, ax), lower=False)
+    frames.set_data(2 * upper)
+    assert np.array_equal(frames.S[frames.im.get_array()], 2 * A)
+    plt.close(fig)
+
+    # Zoom outside of the bands
+    bands = np.ones((2, 100))
+    fig, ax = plt.subplots()
+    im, cb = matshow_banded(bands, (fig, ax))
+    ax.set(xlim=(80, 95), ylim=(20, 5))
+    assert np.all(im.get_array() == 0)  # level of 0 (among 0, 1)
+    plt.close(fig)
+
+
+def test_matshow_single_pass():
+    class Counted(_BandedRaster):
+        passes = 0
+
+        def blocks(self):
+            Counted.passes += 1
+            yield from super().blocks()
+
+    fig, ax = plt.subplots()
+    matshow_discrete(Counted(np.ones((2, 50))), (fig, ax))
+    assert Counted.passes == 1  # the range is taken from the levels
+    plt.close(fig)
+
+
+def test_matshow_levels():
+    X = np.array([[0.5, -1], [2, 0.5]])
+    fig, ax = plt.subplots()
+    im, cb = matshow_discrete(X, (fig, ax))
+    assert np.array_equal(im.get_array(), [[1, 0], [2, 1]])
+    assert matshow_discrete(X, (fig, ax))[-1].formatter(1, 1) == "0.50"  # as tuple
+    assert cb.formatter(1, 1) == "0.50"
+    with pytest.warns(UserWarning, match="unique values"):
+        X = np.arange(10.0).reshape(2, 5)
+        im, cb = matshow_discrete(X, (fig, ax), max_levels=5)
+    assert not isinstance(im.norm, mpl.colors.NoNorm)
+    plt.close(fig)
+
+
+def test_matshow_frames():
+    fig, ax = plt.subplots()
+    frames = matshow_discrete(np.eye(3), (fig, ax))
+    im, cb = frames
+    frames.set_data(2 * np.eye(3))
+    assert len(ax.images) == 1 and len(fig.axes) == 2
+    assert frames.cb is cb and frames.im is im
+    assert np.array_equal(frames.S, [0, 1, 2])
+    assert np.array_equal(im.get_array(), 2 * np.eye(3))  # index of level 2
+    assert cb.formatter(2, 2) == "2.00"
+    assert len(cb.get_ticks()) == 3
+    plt.close(fig)
+
+
+def test_discretize_cmap_cache():
+    discretize_cmap.cache_clear()
+    custom = mpl.colors.ListedColormap(["r", "g", "b"])
+    cmap1, create_cbar, sm1 = discretize_cmap(custom, 4)
+    cmap2, _, sm2 = discretize_cmap(custom, 4)
+    discretize_cmap(plt.cm.viridis, 4)
+    discretize_cmap("viridis", 4)
+    discretize_cmap(custom, 5)
+    info = discretize_cmap.cache_info()
+    assert (info.hits, info.misses) == (2, 3)
+    assert cmap1 is cmap2 and sm1 is sm2
+
+    fig, (ax1, ax2) = plt.subplots(ncols=2)
+    cb1 = create_cbar(ax1, list("abcd"))
+    cb2 = create_cbar(ax2, list("abcd"))
+    assert cb1.mappable is not cb2.mappable
+    plt.close(fig)
+
+
+def test_hist2d_with_marginals():
+    x, y = np.random.randn(2, 1000)
+    x[0], y[0] = 4, 4  # right edges
+    range_ = [(-4, 4), (-4, 4)]
+    H0, *_ = np.histogram2d(x, y, bins=(20, 10), range=range_)
+    axs, (H, xedges, yedges) = hist2d_with_marginals(
+        x, y, bins=(20, 10), range=range_, chunksize=64
+    )
+    assert np.array_equal(H, H0)
+    chunks = zip(np.split(x, 10), np.split(y, 10))
+    _, (H, *_) = hist2d_with_marginals(chunks, bins=(20, 10), range=range_)
+    assert np.array_equal(H, H0)
+    plt.close(axs[0].figure)
+
+
+def test_linked_marginals():
+    x, y = np.random.randn(2, 5000)
+    (ax0, a_x, a_y), (H, xe, ye) = hist2d_with_marginals(x, y, bins=20, linked=True)
+    ax0.set(xlim=(xe[3], xe[9]), ylim=(ye[5], ye[12]))
+    hx = a_x.patches[-1].get_data().values
+    hy = a_y.patches[-1].get_data().values
+    assert np.array_equal(hx, H[:, 5:12].sum(1))
+    assert np.array_equal(hy, H[3:9].sum(0))
+    plt.close(ax0.figure)
+
+
+def test_cov_corner():
+    d, N = 4, 3
+    mu = np.random.randn(N, d)
+    L = np.random.randn(N, d, d)
+    C = L @ L.swapaxes(-1, -2)
+    fig = plt.figure()
+    axs, ellipses = cov_corner(mu, C, fig=fig)
+    assert len(axs) == d * (d - 1) // 2
+    w, h, _ = _ellipse_geometry(C[:, [1, 3]][:, :, [1, 3]])
+    assert np.allclose(ellipses[1, 3].get_widths(), w)
+    assert np.allclose(ellipses[1, 3].get_offsets(), mu[:, [1, 3]])
+    plt.close(fig)
+
+
+def test_cov_accumulator():
+    E = np.einsum("npi,pij->npj", np.random.randn(500, 3, 2), np.random.randn(3, 2, 2))
+    chunks = np.array_split(E, 7)
+    acc1 = CovAccumulator()
+    for chunk in chunks[:4]:
+        acc1.update(chunk)
+    acc2 = CovAccumulator()
+    for chunk in chunks[4:]:
+        acc2.update(chunk)
+    acc = acc1.merge(acc2)
+    assert acc.n == 500
+    assert np.allclose(acc.mean, E.mean(0))
+    for p in range(3):
+        assert np.allclose(acc.cov[p], np.cov(E[:, p].T))
@@ -0,0 +1,234 @@
+"""Test visibility.py"""
+import matplotlib as mpl
+import numpy as np
+import pytest
+from matplotlib import pyplot as plt
+
+from mpl_tools import visibility
+from mpl_tools.visibility import (
+    LineSet,
+    _Blitter,
+    _savefigs,
+    save_toggle,
+    set_viz,
+    toggle_lines,
+    toggle_viz,
+)
+
+
+def test_toggle_lines_pages():
+    fig, ax = plt.subplots()
+    for i in range(45):
+        ax.plot(np.arange(10) * i, label=f"line {i % 7}")  # repeated labels
+    selector = toggle_lines(ax, per_page=20)
+    assert selector.n_pages == 3
+    selector.set_page(2)
+    assert len(selector.check.labels) == 5
+    selector.check.set_active(1)  # line 41
+    assert np.array_equal(np.flatnonzero(~selector.visible), [41])
+    assert not ax.lines[41].get_visible()
+
+    selector.set_filter("line 6")
+    assert np.array_equal(selector.shown, np.arange(6, 45, 7))
+    selector.set_filter("zzz")
+    assert selector.check is None
+    fig.canvas.draw()
+    selector.set_filter("")
+    assert len(selector.check.labels) == 20
+    plt.close(fig)
+
+
+def test_autoscale_bounds():
+    fig, ax = plt.subplots()
+    for i in range(1, 6):
+        ax.plot([0, i], [-i, 10 * i], label=f"{i}")
+    selector = toggle_lines(ax)
+    selector.set_visible(4, False)
+    assert np.allclose(ax.dataLim.bounds, [0, -4, 4, 44])
+    selector.set_visible(3, False)
+    assert np.allclose(ax.dataLim.bounds, [0, -3, 3, 33])
+    ax.lines[0].set_data([-5, 0], [100, 0])  # invalidates cache (of line 0)
+    selector.refresh()
+    selector.set_visible(4, True)
+    assert np.allclose(ax.dataLim.bounds, [-5, -5, 10, 105])
+    plt.close(fig)
+
+
+def test_blitter():
+    fig, ax = plt.subplots()
+    lines = [ax.plot(np.arange(9) * i, label=f"{i}")[0] for i in range(5)]
+    ax.legend()
+    fig.canvas.draw()
+    expected_on = np.array(fig.canvas.buffer_rgba())
+    lines[2].set_visible(False)
+    fig.canvas.draw()
+    expected_off = np.array(fig.canvas.buffer_rgba())
+
+    lines[2].set_visible(True)
+    fig.canvas.draw()
+    blitter = _Blitter(ax, lines)
+    lines[2].set_visible(False)
+    blitter.update()  # renders background
+    assert blitter.background is not None
+    assert np.array_equal(np.array(fig.canvas.buffer_rgba()), expected_off)
+    lines[2].set_visible(True)
+    blitter.update()  # reuses background
+    assert np.array_equal(np.array(fig.canvas.buffer_rgba()), expected_on)
+    plt.close(fig)
+
+
+def test_toggle_viz_figure_artists(monkeypatch):
+    monkeypatch.setattr(visibility, "_can_blit", lambda fig: True)
+    fig, ax = plt.subplots()
+    (line,) = ax.plot(np.arange(3), label="line")
+    title, text = fig.suptitle("title"), fig.text(0.5, 0.5, "text")
+    fig.canvas.draw()
+    assert toggle_viz(title, text, line) == [False, False, False]
+    assert toggle_viz(title, legend=True) == [True]
+    plt.close(fig)
+
+
+def test_can_blit_old_mpl(monkeypatch):
+    monkeypatch.delattr(mpl.backends, "backend_registry", raising=False)
+    monkeypatch.setattr(mpl.rcsetup, "interactive_bk", ["QtAgg"], raising=False)
+    fig, _ = plt.subplots()
+    assert not visibility._can_blit(fig)  # Agg
+    plt.close(fig)
+
+
+def test_lineset():
+    fig, ax = plt.subplots()
+    Y = np.arange(30)[:, None] * np.linspace(0, 1, 5)
+    lines = LineSet(ax, np.arange(5), Y)
+    selector = toggle_lines(lines=lines, state=np.arange(30) < 10)
+    assert lines.collection.get_colors()[10:, 3].max() == 0
+    selector.set_visible(9, False)
+    assert ax.get_ylim()[1] < 9
+    selector.set_visible(29, True)
+    assert lines.visible[29] and lines.collection.get_colors()[29, 3] == 1
+    assert ax.get_ylim()[1] >= 29
+    plt.close(fig)
+
+
+def test_lineset_alpha():
+    fig, ax = plt.subplots()
+    lines = LineSet(ax, np.arange(5), np.ones((4, 5)), alpha=0.2)
+    lines.set_visible([1, 2], False)
+    fig.canvas.draw()
+    assert np.array_equal(lines.collection.get_edgecolor()[:, 3], [0.2, 0, 0, 0.2])
+    plt.close(fig)
+
+
+def test_toggle_viz_legend():
+    fig, ax = plt.subplots()
+    lines = [ax.plot(np.arange(3) * i, label=f"line {i}")[0] for i in range(4)]
+    toggle_viz(*lines[:2], legend=True)
+    leg = ax.get_legend()
+    fig.canvas.draw()
+    h2 = leg.get_window_extent().height
+    toggle_viz(lines[2], legend=True)
+    assert ax.get_legend() is leg  # not rebuilt
+    fig.canvas.draw()
+    assert leg.get_window_extent().height < h2  # re-flowed
+    toggle_viz(lines[3], legend=True)
+    assert not leg.get_visible()
+    toggle_viz(lines[0], legend=True)
+    assert leg.get_visible()
+    fig.canvas.draw()
+    plt.close(fig)
+
+
+def test_set_viz():
+    fig, ax = plt.subplots()
+    lines = LineSet(ax, np.arange(5), np.arange(30)[:, None] * np.ones(5))
+    state = set_viz(lambda i: i >= 10, False, lines=lines, autoscl=True)
+    assert state.sum() == 10 and lines.collection.get_colors()[10:, 3].max() == 0
+    assert ax.get_ylim()[1] < 10
+    state = set_viz("^2", lines=lines)  # toggle 2, 20, ..., 29
+    assert state.sum() == 10 - 1 + 10
+    plt.close(fig)
+
+
+def test_savefigs(tmp_path):
+    fig, ax = plt.subplots(layout="constrained")
+    ax.plot(np.arange(10))
+    ax.set_title("title")
+    _savefigs(fig, tmp_path / "a", ["png", "pdf", "jpg"])
+    fig.savefig(tmp_path / "b.png", bbox_inches="tight", pad_inches=0)
+    a, b = (plt.imread(tmp_path / f) for f in ["a.png", "b.png"])
+    assert abs(np.subtract(a.shape, b.shape)).max() <= 1  # bbox snapped to pixels
+    assert (tmp_path / "a.pdf").stat().st_size and (tmp_path / "a.jpg").stat().st_size
+    assert fig.get_layout_engine() is not None
+    plt.close(fig)
+
+
+@pytest.mark.parametrize(
+    "rc", [{}, {"savefig.transparent": True}, {"savefig.facecolor": "red"}]
+)
+def test_savefigs_as_savefig(tmp_path, rc):
+    with mpl.rc_context(rc):
+        fig, ax = plt.subplots()
+        ax.plot(np.arange(10))
+        _savefigs(fig, tmp_path / "a", ["png"], bbox_inches=None)
+        fig.savefig(tmp_path / "b.png")
+    assert (tmp_path / "a.png").read_bytes() == (tmp_path / "b.png").read_bytes()
+    plt.close(fig)
+
+
+@pytest.mark.parametrize("layers", [False, True])
+def test_savefigs_dpi(tmp_path, layers):
+    fig, ax = plt.subplots()
+    (line,) = ax.plot(np.arange(10))
+    resizes = []
+    fig.canvas.manager.resize = lambda *size: resizes.append(size)
+    fig.canvas._set_device_pixel_ratio(2)  # e.g. HiDPI screen
+    layers = [line] if layers else None
+    _savefigs(fig, tmp_path / "a", ["png"], bbox_inches=None, dpi=300, layers=layers)
+    _savefigs(fig, tmp_path / "b", ["png"], bbox_inches=None, layers=layers)
+    fig.savefig(tmp_path / "c.png")
+    assert not resizes
+    assert fig._original_dpi == 100 and fig.dpi == 200
+    a, b, c = (plt.imread(tmp_path / f"{f}.png") for f in "abc")
+    assert a.shape[:2] == (1440, 1920)
+    assert np.array_equal(b, c)
+    assert c.shape[:2] == (480, 640)
+    plt.close(fig)
+
+
+def test_save_toggle_layers(tmp_path):
+    fig, ax = plt.subplots()
+    ax.imshow(np.random.rand(50, 50), extent=(0, 9, -5, 50))
+    lines = [ax.plot(np.arange(10) * i, lw=3, label=str(i))[0] for i in range(5)]
+    ax.legend()
+    fig.savepath, fig.counter = tmp_path / "fig", 1
+    for line in lines:
+        _savefigs(fig, tmp_path / f"full-{fig.counter}", ["png"])
+        save_toggle(line, fig=fig, pause=0, layers=lines)
+    for k in range(1, 6):
+        assert (tmp_path / f"fig-{k}.png").read_bytes() == (
+            tmp_path / f"full-{k}.png").read_bytes()
+    assert fig._save_layers.background is not None
+    plt.close(fig)
+
+
+def test_set_viz_selector():
+    fig, ax = plt.subplots()
+    ax.plot(np.arange(3), label="_hidden from selector")
+    for i in range(4):
+        ax.plot(np.arange(3) * i, label=f"m{i}")
+    selector = toggle_lines(ax)
+    state = set_viz("m1", False, ax)
+    assert np.array_equal(state, [1, 0, 1, 1])
+    assert np.array_equal(selector.visible, state)
+    assert selector.check.get_status() == [True, False, True, True]
+    assert not ax.lines[2].get_visible()
+    selector.set_visible(3, False)  # the bounds are not stale
+    assert np.allclose(ax.dataLim.bounds, [0, 0, 2, 4])
+
+    fig, ax = plt.subplots()
+    lines = LineSet(ax, np.arange(5), np.arange(30)[:, None] * np.ones(5))
+    selector = toggle_lines(lines=lines)
+    set_viz(np.arange(30) >= 10, False, lines=lines)
+    assert selector.visible.sum() == 10
+    assert sum(selector.check.get_status()) == 10
+    plt.close(fig)